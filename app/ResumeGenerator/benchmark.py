@@ -0,0 +1,130 @@
+"""
+Render-time benchmark for the LaTeX resume generator.
+
+Times Resume.generate_resume on synthetic profiles of increasing size. With
+--baseline, the generator at that git revision is loaded from history and
+timed on the same profiles for comparison:
+
+    python -m app.ResumeGenerator.benchmark --sizes 10 100 500 --baseline HEAD~1
+"""
+from pathlib import Path
+from typing import Callable, Dict, List
+import argparse
+import importlib
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+_WORDS = [
+    "built", "scalable", "R&D", "pipelines", "100%", "coverage", "C#", "micro_services",
+    "{async}", "~2x", "$1M", "revenue", "Python", "FastAPI", "MongoDB", "latency", "reduced",
+]
+
+
+def synthetic_profile(size: int, seed: int = 0) -> Dict:
+    """A profile with `size` experiences, projects and skills and many bullet points"""
+    rng = random.Random(seed)
+
+    def words(count: int) -> str:
+        return " ".join(rng.choice(_WORDS) for _ in range(count))
+
+    def day() -> str:
+        return f"20{rng.randint(10, 24)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+
+    def bullets(count: int) -> str:
+        return "\n".join(words(14) for _ in range(count))
+
+    return {
+        "user_data": {
+            "first_name": "Ada", "middle_name": "", "last_name": "Lovelace",
+            "portfolio_title": words(4), "phone": "+1 555 0100", "email": "ada@example.com",
+            "linkedin_url": "https://www.linkedin.com/in/ada", "github_url": "https://github.com/ada",
+            "leetcode_url": "https://leetcode.com/ada",
+        },
+        "experiences": [
+            {"title": words(2), "company": words(1), "start_date": day(), "end_date": day(), "description": bullets(8)}
+            for _ in range(size)
+        ],
+        "educations": [
+            {"institution": words(3), "start_date": day(), "end_date": day(), "description": bullets(3)}
+            for _ in range(max(1, size // 10))
+        ],
+        "projects": [
+            {"title": words(3), "start_date": day(), "end_date": day(),
+             "technologies": [rng.choice(_WORDS) for _ in range(5)], "description": bullets(6)}
+            for _ in range(size)
+        ],
+        "skills": [{"name": rng.choice(_WORDS), "category": f"Category {i % 8}"} for i in range(size)],
+        "certifications": [
+            {"name": words(3), "issuer": words(1), "issue_date": day(), "description": bullets(2)}
+            for _ in range(max(1, size // 2))
+        ],
+        "awards": [
+            {"name": words(3), "issuer": words(1), "issue_date": day(), "description": bullets(2)}
+            for _ in range(max(1, size // 2))
+        ],
+    }
+
+
+def load_baseline(revision: str, workdir: Path) -> Callable[..., str]:
+    """Import the generator as it was at `revision` and return its generate_resume"""
+    package_dir = workdir / "baseline_templates"
+    shutil.copytree(TEMPLATES_DIR, package_dir, ignore=shutil.ignore_patterns("*.py", "__pycache__"))
+    for name in ("resume.py", "utils.py"):
+        source = subprocess.run(
+            ["git", "show", f"{revision}:app/ResumeGenerator/templates/{name}"],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+        ).stdout
+        (package_dir / name).write_text(source, encoding="utf-8")
+    (package_dir / "__init__.py").write_text("", encoding="utf-8")
+
+    sys.path.insert(0, str(workdir))
+    module = importlib.import_module("baseline_templates.resume")
+    return lambda **profile: module.Resume().generate_resume(**profile)
+
+
+def best_time(render: Callable[..., str], profile: Dict, repeat: int) -> float:
+    timings: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render(**profile)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", help="git revision to compare against, e.g. HEAD~1")
+    args = parser.parse_args(argv)
+
+    from app.ResumeGenerator.templates.resume import Resume
+    current = lambda **profile: Resume().generate_resume(**profile)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        baseline = load_baseline(args.baseline, Path(workdir)) if args.baseline else None
+
+        header = f"{'size':>6} {'chars':>10} {'current ms':>12}"
+        if baseline:
+            header += f" {'baseline ms':>12} {'speedup':>8}"
+        print(header)
+        for size in args.sizes:
+            profile = synthetic_profile(size, seed=size)
+            chars = len(current(**profile))
+            current_time = best_time(current, profile, args.repeat)
+            line = f"{size:>6} {chars:>10} {current_time * 1000:>12.2f}"
+            if baseline:
+                baseline_time = best_time(baseline, profile, args.repeat)
+                line += f" {baseline_time * 1000:>12.2f} {baseline_time / current_time:>7.1f}x"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
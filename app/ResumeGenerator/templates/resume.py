@@ -1,9 +1,14 @@
-from typing import Dict, List
-from .utils import escape_latex, format_date_for_latex, read_template_file
-import yaml
+from typing import Callable, Dict, List, Optional
+from .utils import escape_latex, format_date_for_latex, template_registry
+
+# Section bodies are built by appending fragments to a list and joining once,
+# so rendering stays linear in the size of the profile.
 
 
 class Resume:
+    def __init__(self, version: str = "v1"):
+        self.templates = template_registry.get(version)
+
     def get_full_name(self, user_data: Dict) -> str:
         full_name_list = [user_data.get('first_name', ''), user_data.get('middle_name', ''), user_data.get('last_name', '')]
         full_name_list.remove('') if '' in full_name_list else full_name_list
@@ -17,7 +22,7 @@ class Resume:
         def display(x):
             x = x.replace('https://', '').replace('www.', '')
             return x
-        
+
         link_config = {
             'phone': {'prefix': 'tel:', 'icon': 'Phone', 'display': display},
             'email': {'prefix': 'mailto:', 'icon': 'Envelope', 'display': display},
@@ -26,47 +31,39 @@ class Resume:
             'hackerrank_url': {'prefix': '', 'icon': 'Hackerrank', 'display': display},
             'leetcode_url': {'prefix': '', 'icon': 'Code', 'display': lambda x: 'LeetCode: ' + display(x)}
         }
-        
+
         links = []
-        if user_data.get('phone'):
-            links.append(('phone', user_data.get('phone')))
-        if user_data.get('email'):
-            links.append(('email', user_data.get('email')))
-        if user_data.get('linkedin_url'):
-            links.append(('linkedin_url', user_data.get('linkedin_url')))
-        if user_data.get('github_url'):
-            links.append(('github_url', user_data.get('github_url')))
-        if user_data.get('hackerrank_url'):
-            links.append(('hackerrank_url', user_data.get('hackerrank_url')))
-        if user_data.get('leetcode_url'):
-            links.append(('leetcode_url', user_data.get('leetcode_url')))
-
-        body = ""
+        for link_type in link_config:
+            if user_data.get(link_type):
+                links.append((link_type, user_data.get(link_type)))
+
+        body: List[str] = []
         for i, (link_type, link_value) in enumerate(links, 1):
             if i > 1 and (i - 1) % 3 == 0:
-                body += "    \\\\\n"
-            
+                body.append("    \\\\\n")
+
             config = link_config[link_type]
             url = config['prefix'] + link_value
             display_text = config['display'](link_value)
-            
+
             fa_cmd = "\\" + "fa" + config['icon']  # Build \faPhone, \faEnvelope, etc.
-            body += "    \\href{" + url + "}{" + fa_cmd + "~" + escape_latex(display_text) + "}"
-            
+            body.append("    \\href{" + url + "}{" + fa_cmd + "~" + escape_latex(display_text) + "}")
+
             # Add spacing after each link (except the last one)
             if i < len(links):
-                body += " \\hspace{10pt}\n"
+                body.append(" \\hspace{10pt}\n")
             else:
-                body += "\n"
-        
+                body.append("\n")
+
         portfolio_title = escape_latex(user_data.get('portfolio_title', ''))
         if portfolio_title:
             portfolio_title += "\\\\"
-        
-        return read_template_file("v1/title.txt")\
-            .replace("<FULL_NAME>", escape_latex(self.get_full_name(user_data)))\
-            .replace("<PORTPOLIO_TITLE>", portfolio_title)\
-            .replace("<TITLE_BODY>", body)
+
+        return self.templates.section("title").render(
+            FULL_NAME=escape_latex(self.get_full_name(user_data)),
+            PORTPOLIO_TITLE=portfolio_title,
+            TITLE_BODY="".join(body),
+        )
 
     def group_skills_by_category(self, skills: List[Dict]) -> Dict[str, List[Dict]]:
         skills_by_category: Dict[str, List[Dict]] = {}
@@ -82,144 +79,131 @@ class Resume:
         if skills_by_category == {}:
             return ""
 
-        skill_body = ""
+        bullet_spacing = self.getVerticalSpacing(config['SPACE_BETWEEN_SUB_SECTION_BULLET_POINTS'])
+        skill_body: List[str] = []
         for category, skill_names in skills_by_category.items():
             # skill_names is already a list of strings, so join them directly
             skills_list = ", ".join([escape_latex(name) for name in skill_names])
-            skill_body += "        \\item{\\textbf{\\normalsize{" + escape_latex(category) + ":}} { \\normalsize{" + skills_list + "}}}\n"
-            skill_body += self.getVerticalSpacing(config['SPACE_BETWEEN_SUB_SECTION_BULLET_POINTS'])
-
-        return read_template_file("v1/skills.txt")\
-            .replace("<SKILL_BODY>", skill_body)
+            skill_body.append("        \\item{\\textbf{\\normalsize{" + escape_latex(category) + ":}} { \\normalsize{" + skills_list + "}}}\n")
+            skill_body.append(bullet_spacing)
+
+        return self.templates.section("skills").render(SKILL_BODY="".join(skill_body))
+
+    def _generate_subheading_entries(
+        self,
+        config: Dict,
+        entries: List[Dict],
+        heading: Callable[[Dict], str],
+        dates: Callable[[Dict], str],
+        item_indent: str = "            ",
+        leading_items: Optional[Callable[[Dict], List[str]]] = None,
+    ) -> str:
+        """Render a list of \\resumeSubheading entries with their description bullets"""
+        section_spacing = self.getVerticalSpacing(config['SPACE_BETWEEN_SUB_SECTIONS'])
+        title_spacing = self.getVerticalSpacing(config['SPACE_BETWEEN_SUB_SECTION_ITEM_TITLE_AND_CONTENT'])
+        bullet_spacing = self.getVerticalSpacing(config['SPACE_BETWEEN_SUB_SECTION_BULLET_POINTS'])
+
+        out: List[str] = []
+        for i, entry in enumerate(entries):
+            if i > 0:
+                out.append(section_spacing)
+            out.append("        \\resumeSubheading\n")
+            out.append("            {" + heading(entry) + "}{" + dates(entry) + "}\n")
+            out.append("            {}{}\n")
+            out.append(title_spacing)
+            out.append("        \\resumeItemListStart\n")
+            if leading_items is not None:
+                out.extend(leading_items(entry))
+            for j, subdesc in enumerate(entry.get('description', '').split('\n')):
+                if j > 0:
+                    out.append(bullet_spacing)
+                subdesc = subdesc.strip()
+                if subdesc:
+                    out.append(item_indent + "\\resumeItem{" + escape_latex(subdesc) + "}\n")
+            out.append("        \\resumeItemListEnd\n")
+        return "".join(out)
+
+    def _date_range(self, entry: Dict) -> str:
+        return format_date_for_latex(entry.get('start_date', '')) + " -- " + format_date_for_latex(entry.get('end_date', ''))
+
+    def _issue_date(self, entry: Dict) -> str:
+        return format_date_for_latex(entry.get('issue_date', ''))
+
+    def _name_and_issuer(self, entry: Dict) -> str:
+        return escape_latex(entry.get('name', '')) + " (" + escape_latex(entry.get('issuer', '')) + ")"
 
     def generate_experience_section(self, config: Dict, experiences: List[Dict]) -> str:
         if len(experiences) == 0:
             return ""
-        
-        content = "\\section{EXPERIENCE} {\n"
-        content += "    \\resumeSubHeadingListStart\n"
 
-        experience_body = ""
-        for i, experience in enumerate(sorted(experiences, key=lambda x: x.get('start_date') or '', reverse=True)):
-            if i > 0:
-                experience_body += self.getVerticalSpacing(config['SPACE_BETWEEN_SUB_SECTIONS'])
-            experience_body += "        \\resumeSubheading\n"
-            experience_body += "            {" + escape_latex(experience.get('title', '')) + " (" + escape_latex(experience.get('company', '')) + ")}{" + format_date_for_latex(experience.get('start_date', '')) + " -- " + format_date_for_latex(experience.get('end_date', '')) + "}\n"
-            experience_body += "            {}{}\n"
-            experience_body += self.getVerticalSpacing(config['SPACE_BETWEEN_SUB_SECTION_ITEM_TITLE_AND_CONTENT'])
-            experience_body += "        \\resumeItemListStart\n"
-            for i, subdesc in enumerate(experience.get('description', '').split('\n')):
-                if i > 0:
-                    experience_body += self.getVerticalSpacing(config['SPACE_BETWEEN_SUB_SECTION_BULLET_POINTS'])
-                if subdesc.strip():
-                    experience_body += "            \\resumeItem{" + escape_latex(subdesc.strip()) + "}\n"
-            experience_body += "        \\resumeItemListEnd\n"
-
-        return read_template_file("v1/experience.txt")\
-            .replace("<EXPERIENCE_BODY>", experience_body)
+        experience_body = self._generate_subheading_entries(
+            config,
+            sorted(experiences, key=lambda x: x.get('start_date') or '', reverse=True),
+            heading=lambda x: escape_latex(x.get('title', '')) + " (" + escape_latex(x.get('company', '')) + ")",
+            dates=self._date_range,
+        )
+        return self.templates.section("experience").render(EXPERIENCE_BODY=experience_body)
 
     def generate_education_section(self, config: Dict, educations: List[Dict]) -> str:
         if len(educations) == 0:
             return ""
-        
-        education_body = ""
-        for i, education in enumerate(sorted(educations, key=lambda x: x.get('start_date', ''), reverse=True)):
-            if i > 0:
-                education_body += self.getVerticalSpacing(config['SPACE_BETWEEN_SUB_SECTIONS'])
-            education_body += "        \\resumeSubheading\n"
-            education_body += "            {" + escape_latex(education.get('institution', '')) + "}{" + format_date_for_latex(education.get('start_date', '')) + " -- " + format_date_for_latex(education.get('end_date', '')) + "}\n"
-            education_body += "            {}{}\n"
-            education_body += self.getVerticalSpacing(config['SPACE_BETWEEN_SUB_SECTION_ITEM_TITLE_AND_CONTENT'])
-            education_body += "        \\resumeItemListStart\n"
-            for i, subdesc in enumerate(education.get('description', '').split('\n')):
-                if i > 0:
-                    education_body += self.getVerticalSpacing(config['SPACE_BETWEEN_SUB_SECTION_BULLET_POINTS'])
-                if subdesc.strip():
-                    education_body += "            \\resumeItem{" + escape_latex(subdesc.strip()) + "}\n"
-            education_body += "        \\resumeItemListEnd\n"
-
-        return read_template_file("v1/education.txt")\
-            .replace("<EDUCATION_BODY>", education_body)
+
+        education_body = self._generate_subheading_entries(
+            config,
+            sorted(educations, key=lambda x: x.get('start_date', ''), reverse=True),
+            heading=lambda x: escape_latex(x.get('institution', '')),
+            dates=self._date_range,
+        )
+        return self.templates.section("education").render(EDUCATION_BODY=education_body)
 
     def generate_project_section(self, config: Dict, projects: List[Dict]) -> str:
         if len(projects) == 0:
             return ""
-        
-        project_body = ""
-        for i, project in enumerate(sorted(projects, key=lambda x: x.get('start_date', ''), reverse=True)):
-            if i > 0:
-                project_body += self.getVerticalSpacing(config['SPACE_BETWEEN_SUB_SECTIONS'])
-            project_body += "        \\resumeSubheading\n"
-            project_body += "            {" + escape_latex(project.get('title', '')) + " }{" + format_date_for_latex(project.get('start_date', '')) + " -- " + format_date_for_latex(project.get('end_date', '')) + "}\n"
-            project_body += "            {}{}\n"
-            project_body += self.getVerticalSpacing(config['SPACE_BETWEEN_SUB_SECTION_ITEM_TITLE_AND_CONTENT'])
-            project_body += "        \\resumeItemListStart\n"
-            tech_list = project.get('technologies', [])
-            if tech_list:
-                tech_str = ", ".join([escape_latex(str(t)) for t in tech_list])
-                # Add technologies line without double-escaping
-                project_body += "            \\resumeItem{Technologies: " + tech_str + "}\n"
-            for i, subdesc in enumerate(project.get('description', '').split('\n')):
-                if i > 0:
-                    project_body += self.getVerticalSpacing(config['SPACE_BETWEEN_SUB_SECTION_BULLET_POINTS'])
-                if subdesc.strip():
-                    project_body += "            \\resumeItem{" + escape_latex(subdesc.strip()) + "}\n"
-
-            project_body += "        \\resumeItemListEnd\n"
 
-        return read_template_file("v1/project.txt")\
-            .replace("<PROJECT_BODY>", project_body)
+        def technologies(project: Dict) -> List[str]:
+            tech_list = project.get('technologies', [])
+            if not tech_list:
+                return []
+            tech_str = ", ".join([escape_latex(str(t)) for t in tech_list])
+            # Add technologies line without double-escaping
+            return ["            \\resumeItem{Technologies: " + tech_str + "}\n"]
+
+        project_body = self._generate_subheading_entries(
+            config,
+            sorted(projects, key=lambda x: x.get('start_date', ''), reverse=True),
+            heading=lambda x: escape_latex(x.get('title', '')) + " ",
+            dates=self._date_range,
+            leading_items=technologies,
+        )
+        return self.templates.section("project").render(PROJECT_BODY=project_body)
 
     def generate_achievement_section(self, config: Dict, awards: List[Dict]) -> str:
         if len(awards) == 0:
             return ""
-        
-        achievement_body = ""
-        for i, award in enumerate(awards):
-            if i > 0:
-                achievement_body += self.getVerticalSpacing(config['SPACE_BETWEEN_SUB_SECTIONS'])
-            achievement_body += "        \\resumeSubheading\n"
-            achievement_body += "            {" + escape_latex(award.get('name', '')) + " (" + escape_latex(award.get('issuer', '')) + ")}{" + format_date_for_latex(award.get('issue_date', '')) + "}\n"
-            achievement_body += "            {}{}\n"
-            achievement_body += self.getVerticalSpacing(config['SPACE_BETWEEN_SUB_SECTION_ITEM_TITLE_AND_CONTENT'])
-            achievement_body += "        \\resumeItemListStart\n"
-            for i, subdesc in enumerate(award.get('description', '').split('\n')):
-                if i > 0:
-                    achievement_body += self.getVerticalSpacing(config['SPACE_BETWEEN_SUB_SECTION_BULLET_POINTS'])
-                if subdesc.strip():
-                    achievement_body += "        \\resumeItem{" + escape_latex(subdesc.strip()) + "}\n"
-            achievement_body += "        \\resumeItemListEnd\n"
-
-        return read_template_file("v1/achievement.txt")\
-            .replace("<ACHIEVEMENT_BODY>", achievement_body)
+
+        achievement_body = self._generate_subheading_entries(
+            config,
+            awards,
+            heading=self._name_and_issuer,
+            dates=self._issue_date,
+            item_indent="        ",
+        )
+        return self.templates.section("achievement").render(ACHIEVEMENT_BODY=achievement_body)
 
     def generate_certification_section(self, config: Dict, certifications: List[Dict]) -> str:
         if len(certifications) == 0:
             return ""
-        
-        certification_body = ""
-        for i, certification in enumerate(certifications):
-            if i > 0:
-                certification_body += self.getVerticalSpacing(config['SPACE_BETWEEN_SUB_SECTIONS'])
-            certification_body += "        \\resumeSubheading\n"
-            certification_body += "            {" + escape_latex(certification.get('name', '')) + " (" + escape_latex(certification.get('issuer', '')) + ")}{" + format_date_for_latex(certification.get('issue_date', '')) + "}\n"
-            certification_body += "            {}{}\n"
-            certification_body += self.getVerticalSpacing(config['SPACE_BETWEEN_SUB_SECTION_ITEM_TITLE_AND_CONTENT'])
-            certification_body += "        \\resumeItemListStart\n"
-            for i, subdesc in enumerate(certification.get('description', '').split('\n')):
-                if i > 0:
-                    certification_body += self.getVerticalSpacing(config['SPACE_BETWEEN_SUB_SECTION_BULLET_POINTS'])
-                if subdesc.strip():
-                    certification_body += "            \\resumeItem{" + escape_latex(subdesc.strip()) + "}\n"
-            certification_body += "        \\resumeItemListEnd\n"
-
-        return read_template_file("v1/certification.txt")\
-            .replace("<CERTIFICATION_BODY>", certification_body)
+
+        certification_body = self._generate_subheading_entries(
+            config,
+            certifications,
+            heading=self._name_and_issuer,
+            dates=self._issue_date,
+        )
+        return self.templates.section("certification").render(CERTIFICATION_BODY=certification_body)
 
     def generate_resume(self, user_data: Dict, experiences: List[Dict], educations: List[Dict], projects: List[Dict], skills: List[Dict], certifications: List[Dict], awards: List[Dict]) -> str:
-        template_content = read_template_file("v1/template.txt")
-        methods_content = read_template_file("v1/methods.txt")
-        config = yaml.safe_load(read_template_file("v1/config.yml"))
+        config = self.templates.config
 
         sections = [{'title': 'TITLE', 'content': self.generate_title_section(user_data)},
                     {'title': 'SKILLS', 'content': self.generate_skills_section(config, skills)},
@@ -229,19 +213,15 @@ class Resume:
                     {'title': 'ACHIEVEMENTS', 'content': self.generate_achievement_section(config, awards)},
                     {'title': 'CERTIFICATIONS', 'content': self.generate_certification_section(config,certifications)}]
 
-        resume_body = ""
+        section_spacing = self.getVerticalSpacing(config['SPACE_BETWEEN_SECTIONS'])
+        resume_body: List[str] = []
         i = 0
         for section in sections:
             if i > 0:
-                resume_body += self.getVerticalSpacing(config['SPACE_BETWEEN_SECTIONS'])
+                resume_body.append(section_spacing)
             if section['content'] == "":
                 continue
-            resume_body += section['content'] + "\n"
+            resume_body.append(section['content'] + "\n")
             i += 1
 
-        content = read_template_file("v1/resume.txt")\
-            .replace("<TEMPLATE_CONTENT>", template_content)\
-            .replace("<METHODS_CONTENT>", methods_content)\
-            .replace("<RESUME_BODY>", resume_body)
-
-        return content
\ No newline at end of file
+        return self.templates.document.render(RESUME_BODY="".join(resume_body))
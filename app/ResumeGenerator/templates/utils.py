@@ -1,40 +1,45 @@
 from pathlib import Path
+from typing import Dict, Optional, Tuple
+import re
+import threading
+import yaml
+from app.config import settings
+
+# Replacement for each LaTeX special character
+_LATEX_ESCAPES = {
+    '&': r'\&',
+    '#': r'\#',
+    '%': r'\%',
+    '$': r'\$',
+    '^': r'\textasciicircum{}',
+    '_': r'\_',
+    '{': r'\{',
+    '}': r'\}',
+    '~': r'\textasciitilde{}',
+    '\\': r'\textbackslash{}',
+}
+
+# A special character that is NOT already escaped (negative lookbehind), or a
+# backslash that is NOT part of a valid escape sequence or LaTeX command
+_LATEX_SPECIAL_PATTERN = re.compile(r'(?<!\\)[&#%$^_{}~]|\\(?![#&$%_{}~\\a-zA-Z])')
+
+def _escape_latex_match(match: "re.Match[str]") -> str:
+    return _LATEX_ESCAPES[match.group()]
 
 def escape_latex(text: str) -> str:
     """Escape special LaTeX characters
     
     Properly escapes all LaTeX special characters, handling edge cases.
+    Characters that are already escaped are left alone. All replacements
+    happen in a single regex pass.
     """
     if not text:
         return ""
     
     # Convert to string to handle any type
     text = str(text)
-    
-    import re
-    
-    # Strategy: Use regex with negative lookbehind to avoid double-escaping
-    # This ensures we don't escape characters that are already escaped
-    
-    # STEP 1: Escape special characters that are NOT already escaped
-    # Negative lookbehind (?<!\\) means "not preceded by backslash"
-    text = re.sub(r'(?<!\\)&', r'\\&', text)
-    text = re.sub(r'(?<!\\)#', r'\\#', text)
-    text = re.sub(r'(?<!\\)%', r'\\%', text)
-    text = re.sub(r'(?<!\\)\$', r'\\$', text)
-    text = re.sub(r'(?<!\\)\^', r'\\textasciicircum{}', text)
-    text = re.sub(r'(?<!\\)_', r'\\_', text)
-    text = re.sub(r'(?<!\\)\{', r'\\{', text)
-    text = re.sub(r'(?<!\\)\}', r'\\}', text)
-    text = re.sub(r'(?<!\\)~', r'\\textasciitilde{}', text)
-    
-    # STEP 2: Escape backslashes that are NOT part of valid LaTeX escape sequences
-    # Match backslash that is NOT followed by a valid escape character
-    # Valid escape chars: #, &, %, $, ^, _, {, }, ~, \, and common LaTeX commands
-    # We want to escape standalone backslashes, not those in "\#", "\&", etc.
-    text = re.sub(r'\\(?![#&$%_{}~\\a-zA-Z])', r'\\textbackslash{}', text)
-    
-    return text
+
+    return _LATEX_SPECIAL_PATTERN.sub(_escape_latex_match, text)
 
 def format_date_for_latex(date) -> str:
     """Format date string (YYYY-MM-DD) or datetime object for LaTeX output"""
@@ -62,4 +67,90 @@ def read_template_file(filename: str) -> str:
     template_path = current_file.parent / filename
     if not template_path.exists():
         raise FileNotFoundError(f"Template file not found: {template_path}")
-    return template_path.read_text(encoding='utf-8')
\ No newline at end of file
+    return template_path.read_text(encoding='utf-8')
+
+PLACEHOLDER_PATTERN = re.compile(r"<([A-Z_]+)>")
+
+class CompiledTemplate:
+    """Template text pre-split on its <PLACEHOLDER> markers"""
+
+    def __init__(self, text: str):
+        self.text = text
+        # Alternating literal text and placeholder names: [text, NAME, text, ...]
+        self._parts = PLACEHOLDER_PATTERN.split(text)
+
+    def render(self, **values: str) -> str:
+        """Fill placeholders in one pass; unknown placeholders are left as-is"""
+        parts = self._parts
+        out = [parts[0]]
+        for i in range(1, len(parts), 2):
+            name = parts[i]
+            out.append(values[name] if name in values else "<" + name + ">")
+            out.append(parts[i + 1])
+        return "".join(out)
+
+class TemplateSet:
+    """All templates and the parsed config of one template version (e.g. "v1")"""
+
+    def __init__(self, version: str, directory: Path):
+        self.version = version
+        self.directory = directory
+        self.templates: Dict[str, CompiledTemplate] = {}
+        for path in sorted(directory.glob("*.txt")):
+            self.templates[path.stem] = CompiledTemplate(path.read_text(encoding='utf-8'))
+        self.config: Dict = yaml.safe_load((directory / "config.yml").read_text(encoding='utf-8'))
+        # The document shell with the static preamble parts already filled in,
+        # leaving only <RESUME_BODY>
+        self.document = CompiledTemplate(self.section("resume").render(
+            TEMPLATE_CONTENT=self.section("template").text,
+            METHODS_CONTENT=self.section("methods").text,
+        ))
+        self.mtimes = _template_mtimes(directory)
+
+    def section(self, name: str) -> CompiledTemplate:
+        template = self.templates.get(name)
+        if template is None:
+            raise FileNotFoundError(f"Template file not found: {self.directory / (name + '.txt')}")
+        return template
+
+def _template_mtimes(directory: Path) -> Tuple[Tuple[str, float], ...]:
+    return tuple(
+        (path.name, path.stat().st_mtime)
+        for path in sorted(directory.iterdir())
+        if path.suffix in (".txt", ".yml")
+    )
+
+class TemplateRegistry:
+    """
+    Loads each template version once and keeps it in memory.
+
+    With `auto_reload` (for development) a version is reloaded when any of its
+    files changes on disk; otherwise rendering does no disk I/O at all.
+    """
+
+    def __init__(self, base_dir: Optional[Path] = None, auto_reload: bool = False):
+        self.base_dir = base_dir or Path(__file__).parent
+        self.auto_reload = auto_reload
+        self._versions: Dict[str, TemplateSet] = {}
+        self._lock = threading.Lock()
+
+    def get(self, version: str = "v1") -> TemplateSet:
+        template_set = self._versions.get(version)
+        if template_set is not None and not self.auto_reload:
+            return template_set
+
+        directory = self.base_dir / version
+        if not directory.is_dir():
+            raise FileNotFoundError(f"Template version not found: {directory}")
+        with self._lock:
+            template_set = self._versions.get(version)
+            if template_set is None or template_set.mtimes != _template_mtimes(directory):
+                template_set = TemplateSet(version, directory)
+                self._versions[version] = template_set
+        return template_set
+
+    def clear(self) -> None:
+        with self._lock:
+            self._versions.clear()
+
+template_registry = TemplateRegistry(auto_reload=settings.resume_template_auto_reload)
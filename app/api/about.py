@@ -1,59 +1,50 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from typing import Optional
 from app.models.user import User
 from app.schemas.user import PortfolioUpdate
 from datetime import datetime
-from app.utils.auth import get_current_user
+from app.utils.auth import get_current_user, require_role
+from app.utils.token_cache import token_cache
+from app.utils.portfolio_snapshot import get_snapshot, portfolio_data, read_user_fields, refresh_user
+from app.utils.section_cache import section_cache
+from app.utils.http_cache import PORTFOLIO_SECTIONS, check_not_modified
+from app.utils.crud import update_fields
 from beanie import PydanticObjectId
 
 router = APIRouter()
 
 # get portfolio by user id
 @router.get('/user/{user_id}')
-async def read_portfolio_by_user(user_id: PydanticObjectId):
-    user = await User.get(user_id)
-    if user is None:
+async def read_portfolio_by_user(user_id: PydanticObjectId, response: Response, if_none_match: Optional[str] = Header(None)):
+    not_modified, versions = await check_not_modified(response, if_none_match, user_id, 'user')
+    if not_modified:
+        return not_modified
+    fields = await read_user_fields(user_id, versions['user'])
+    if fields is None:
         raise HTTPException(status_code=400, detail='User not found')
     
-    return {
-        'first_name': user.first_name,
-        'middle_name': user.middle_name,
-        'last_name': user.last_name,
-        'portfolio_title': user.portfolio_title,
-        'portfolio_description': user.portfolio_description,
-        'portfolio_education': user.portfolio_education or [],
-        'portfolio_certifications': user.portfolio_certifications or [],
-        'portfolio_awards': user.portfolio_awards or [],
-        'title': user.title,
-        'phone': user.phone,
-        'github_url': user.github_url,
-        'twitter_url': user.twitter_url,
-        'instagram_url': user.instagram_url,
-        'linkedin_url': user.linkedin_url,
-        'leetcode_url': user.leetcode_url,
-        'website_url': user.website_url
-    }
+    return fields['portfolio']
+
+# get a user's whole public portfolio page (portfolio, user and every section) in one read
+@router.get('/user/{user_id}/full')
+async def read_full_portfolio_by_user(user_id: PydanticObjectId, response: Response, if_none_match: Optional[str] = Header(None)):
+    not_modified, versions = await check_not_modified(response, if_none_match, user_id, *PORTFOLIO_SECTIONS)
+    if not_modified:
+        return not_modified
+    snapshot = await get_snapshot(user_id, versions)
+    if snapshot is None:
+        raise HTTPException(status_code=400, detail='User not found')
+    return snapshot
+
+# get public portfolio section cache counters (admin only)
+@router.get('/cache-stats', dependencies=[Depends(require_role("admin"))])
+async def get_section_cache_stats(current_user: User = Depends(get_current_user)):
+    return section_cache.stats()
 
 # get current user's portfolio
 @router.get('/')
 async def get_current_user_portfolio(current_user: User = Depends(get_current_user)):
-    return {
-        'first_name': current_user.first_name,
-        'middle_name': current_user.middle_name,
-        'last_name': current_user.last_name,
-        'portfolio_title': current_user.portfolio_title,
-        'portfolio_description': current_user.portfolio_description,
-        'portfolio_education': current_user.portfolio_education or [],
-        'portfolio_certifications': current_user.portfolio_certifications or [],
-        'portfolio_awards': current_user.portfolio_awards or [],
-        'title': current_user.title,
-        'phone': current_user.phone,
-        'github_url': current_user.github_url,
-        'twitter_url': current_user.twitter_url,
-        'instagram_url': current_user.instagram_url,
-        'linkedin_url': current_user.linkedin_url,
-        'leetcode_url': current_user.leetcode_url,
-        'website_url': current_user.website_url
-    }
+    return portfolio_data(current_user)
 
 # update portfolio
 @router.put('/')
@@ -61,10 +52,14 @@ async def update_portfolio(portfolio: PortfolioUpdate, current_user: User = Depe
     # Update only the portfolio fields
     update_data = portfolio.model_dump(exclude_unset=True)
     if update_data:
-        for field, value in update_data.items():
-            setattr(current_user, field, value)
-        current_user.updated_at = datetime.now()
-        await current_user.save()
+        # $set only the sent fields; current_user may be a cached copy, and
+        # saving it whole would overwrite concurrent changes (e.g. visitor_count)
+        updated_user = await update_fields(User, {"_id": current_user.id}, {**update_data, 'updated_at': datetime.now()})
+        if updated_user is None:
+            raise HTTPException(status_code=400, detail='User not found')
+        current_user = updated_user
+        token_cache.invalidate_user(current_user.id)
+        await refresh_user(current_user.id)
     
     return {
         'message': 'Portfolio updated successfully',
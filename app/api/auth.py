@@ -2,8 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, Header
 from fastapi.security import OAuth2PasswordRequestForm
 from typing import Optional
 import asyncio
-from app.utils.auth import require_role, pwd_context, create_access_token, get_current_user, verify_token, oauth2_scheme
+from app.utils.auth import require_role, password_hasher, create_access_token, get_current_user, verify_token, oauth2_scheme
 from app.utils.token_cleanup import cleanup_expired_tokens, get_blacklist_stats
+from app.utils.token_cache import token_cache
+from app.utils.token_usage import token_usage
 from app.models.user import User
 from app.models.access_token import AccessToken
 from app.schemas.user import UserCreate, UserResponse
@@ -20,7 +22,7 @@ async def register(user: UserCreate):
     new_user = User(
         email=user.email,
         username=user.username,
-        hashed_password=pwd_context.hash(user.password),
+        hashed_password=await password_hasher.hash(user.password),
         role=UserRole.viewer,  # Default role is viewer, not admin
         is_active=UserStatus.active,
         first_name=user.first_name,
@@ -38,12 +40,18 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    if not pwd_context.verify(form_data.password, user.hashed_password):  # type: ignore
+    is_valid, new_hash = await password_hasher.verify_and_update(form_data.password, user.hashed_password)  # type: ignore
+    if not is_valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     if user.is_active is UserStatus.inactive:
         raise HTTPException(status_code=401, detail="Inactive user")
 
+    # Transparently upgrade hashes that use deprecated schemes or settings,
+    # only once the login has passed every check
+    if new_hash:
+        await user.set({User.hashed_password: new_hash})
+
     access_token = await create_access_token(
         data={
             "username": user.username,
@@ -62,8 +70,10 @@ async def get_me(current_user: User = Depends(get_current_user)):
 async def refresh_token(current_user: User = Depends(get_current_user), token: str = Depends(oauth2_scheme)):
     """Refresh the access token, extending the expiry time."""
     # Delete old token
+    token_cache.invalidate(token)
     old_token = await AccessToken.find_one(AccessToken.token == token)
     if old_token:
+        token_usage.discard(old_token.id)  # type: ignore
         await old_token.delete()
     
     # Create new token
@@ -80,8 +90,10 @@ async def refresh_token(current_user: User = Depends(get_current_user), token: s
 async def logout(current_user: User = Depends(get_current_user), token: str = Depends(oauth2_scheme)):
     """Logout user by deleting the current token from database."""
     # Delete the token from database
+    token_cache.invalidate(token)
     token_doc = await AccessToken.find_one(AccessToken.token == token)
     if token_doc:
+        token_usage.discard(token_doc.id)  # type: ignore
         await token_doc.delete()
         return {"message": "Successfully logged out"}
     else:
@@ -91,26 +103,22 @@ async def logout(current_user: User = Depends(get_current_user), token: str = De
 @router.post("/auth/cleanup-tokens", dependencies=[Depends(require_role("admin"))])
 async def manual_cleanup_tokens(current_user: User = Depends(get_current_user)):
     """Manually trigger cleanup of expired tokens (admin only)."""
-    from app.utils.token_cleanup import cleanup_expired_access_tokens
+    from app.utils.token_cleanup import cleanup_expired_access_tokens, get_token_stats as compute_token_stats
     deleted_count = await cleanup_expired_access_tokens()
-    stats = await get_token_stats()
+    stats = await compute_token_stats()
     return {
         "message": "Cleanup completed",
         "deleted_tokens": deleted_count,
         "stats": stats
     }
 
+@router.get("/auth/password-hash-stats", dependencies=[Depends(require_role("admin"))])
+async def get_password_hash_stats(current_user: User = Depends(get_current_user)):
+    """Get password hashing pool utilization (admin only)."""
+    return password_hasher.stats()
+
 @router.get("/auth/token-stats", dependencies=[Depends(require_role("admin"))])
 async def get_token_stats(current_user: User = Depends(get_current_user)):
     """Get statistics about active tokens (admin only)."""
-    current_time = datetime.now(timezone.utc)
-    total_count = await AccessToken.count()
-    expired_count = await AccessToken.find(
-        AccessToken.expires_at < current_time
-    ).count()
-    
-    return {
-        "total_tokens": total_count,
-        "expired_tokens": expired_count,
-        "active_tokens": total_count - expired_count
-    }
\ No newline at end of file
+    from app.utils.token_cleanup import get_token_stats as compute_token_stats
+    return await compute_token_stats()
\ No newline at end of file
@@ -1,51 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header, Response
 from app.models.award import Award
 from app.schemas.award import AwardCreate
-from typing import List
-from datetime import datetime, timezone
+from typing import List, Optional
 from app.utils.auth import get_current_user
 from app.models.user import User
 from bson import ObjectId
 from app.schemas.error import Error
+from app.utils.portfolio_snapshot import read_section, refresh_section
+from app.utils.http_cache import check_not_modified
+from app.utils.crud import update_owned_document
 from beanie import PydanticObjectId
 
 router = APIRouter()
 
 # get awards by user id
 @router.get('/awards/user/{user_id}', response_model=List[Award])
-async def read_awards_by_user(user_id: PydanticObjectId):
-    return await Award.find(Award.user_id == user_id).to_list()
+async def read_awards_by_user(user_id: PydanticObjectId, response: Response, if_none_match: Optional[str] = Header(None)):
+    not_modified, versions = await check_not_modified(response, if_none_match, user_id, 'awards')
+    if not_modified:
+        return not_modified
+    return await read_section('awards', user_id, versions['awards'])
 
 # create award
 @router.post('/awards', response_model=Award)
 async def create_award(award: AwardCreate, current_user: User = Depends(get_current_user)):
     new_award = {**award.model_dump(), 'user_id': current_user.id}
     award_created = await Award(**new_award).insert()
+    await refresh_section(current_user.id, 'awards')
     return award_created
 
 # update award
 @router.put('/awards/{award_id}', response_model=Award)
 async def update_award(award_id: str, award: AwardCreate, current_user: User = Depends(get_current_user)):
-    updated_award = await Award.get(award_id)
-    if updated_award is None:
-        raise HTTPException(
-            status_code=404, detail=Error(
-                message='Award not found', 
-                status_code=404
-            ).model_dump()
-        )
-    if updated_award.user_id != ObjectId(current_user.id):
-        raise HTTPException(
-            status_code=403, 
-            detail=Error(
-                message='You are not allowed to update this award', 
-                status_code=403
-            ).model_dump()
-        )
-    for key, value in award.model_dump().items():
-        setattr(updated_award, key, value)
-    updated_award.updated_at = datetime.now(timezone.utc) # type: ignore
-    await updated_award.save()
+    updated_award = await update_owned_document(
+        Award, award_id, current_user.id, award.model_dump(), 'award'
+    )
+    await refresh_section(current_user.id, 'awards')
     return updated_award
     
 # delete award
@@ -69,4 +59,5 @@ async def delete_award(award_id: str, current_user: User = Depends(get_current_u
             ).model_dump()
         )
     await target_award.delete()
+    await refresh_section(current_user.id, 'awards')
     return {'message': 'Award deleted successfully'}
@@ -1,49 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header, Response
 from app.models.certification import Certification
 from app.schemas.certification import CertificationCreate
-from typing import List
-from datetime import datetime, timezone
+from typing import List, Optional
 from app.utils.auth import get_current_user
 from app.models.user import User
 from bson import ObjectId
 from app.schemas.error import Error
+from app.utils.portfolio_snapshot import read_section, refresh_section
+from app.utils.http_cache import check_not_modified
+from app.utils.crud import update_owned_document
 from beanie import PydanticObjectId
 router = APIRouter()
 
 # get certifications by user id
 @router.get('/certifications/user/{user_id}', response_model=List[Certification])
-async def read_certifications_by_user(user_id: PydanticObjectId):
-    return await Certification.find(Certification.user_id == user_id).to_list()
+async def read_certifications_by_user(user_id: PydanticObjectId, response: Response, if_none_match: Optional[str] = Header(None)):
+    not_modified, versions = await check_not_modified(response, if_none_match, user_id, 'certifications')
+    if not_modified:
+        return not_modified
+    return await read_section('certifications', user_id, versions['certifications'])
 
 # create certification
 @router.post('/certifications', response_model=Certification)
 async def create_certification(certification: CertificationCreate, current_user: User = Depends(get_current_user)):
     new_certification = {**certification.model_dump(), 'user_id': current_user.id}
     certification_created = await Certification(**new_certification).insert()
+    await refresh_section(current_user.id, 'certifications')
     return certification_created
 
 # update certification
 @router.put('/certifications/{certification_id}', response_model=Certification)
 async def update_certification(certification_id: str, certification: CertificationCreate, current_user: User = Depends(get_current_user)):
-    updated_certification = await Certification.get(certification_id)
-    if updated_certification is None:
-        raise HTTPException(
-            status_code=404, detail=Error(
-                message='Certification not found', 
-                status_code=404
-            ).model_dump()
-        )
-    if updated_certification.user_id != ObjectId(current_user.id):
-        raise HTTPException(
-            status_code=403, detail=Error(
-                message='You are not allowed to update this certification', 
-                status_code=403
-            ).model_dump()
-        )
-    for key, value in certification.model_dump().items():
-        setattr(updated_certification, key, value)
-    updated_certification.updated_at = datetime.now(timezone.utc) # type: ignore
-    await updated_certification.save()
+    updated_certification = await update_owned_document(
+        Certification, certification_id, current_user.id, certification.model_dump(), 'certification'
+    )
+    await refresh_section(current_user.id, 'certifications')
     return updated_certification
     
 # delete certification
@@ -65,4 +56,5 @@ async def delete_certification(certification_id: str, current_user: User = Depen
             ).model_dump()
         )
     await target_certification.delete()
+    await refresh_section(current_user.id, 'certifications')
     return {'message': 'Certification deleted successfully'}
\ No newline at end of file
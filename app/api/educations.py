@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Header, Response
 from app.models.education import Education
 from app.schemas.education import EducationCreate
-from typing import List
-from datetime import datetime, timezone
+from typing import List, Optional
 from app.utils.auth import get_current_user
 from app.models.user import User
 from bson import ObjectId
 from app.schemas.error import Error
+from app.utils.portfolio_snapshot import read_section, refresh_section
+from app.utils.http_cache import check_not_modified
+from app.utils.crud import update_owned_document
 from beanie import PydanticObjectId
 
 router = APIRouter()
@@ -18,40 +20,27 @@ async def get_current_user_educations(current_user: User = Depends(get_current_u
 
 # get educations by user id
 @router.get('/user/{user_id}', response_model=List[Education])
-async def read_educations_by_user(user_id: PydanticObjectId):
-    return await Education.find(Education.user_id == user_id).to_list()
+async def read_educations_by_user(user_id: PydanticObjectId, response: Response, if_none_match: Optional[str] = Header(None)):
+    not_modified, versions = await check_not_modified(response, if_none_match, user_id, 'educations')
+    if not_modified:
+        return not_modified
+    return await read_section('educations', user_id, versions['educations'])
 
 # create education
 @router.post('', response_model=Education)
 async def create_education(education: EducationCreate, current_user: User = Depends(get_current_user)):
     new_education = {**education.model_dump(), 'user_id': current_user.id}
     education_created = await Education(**new_education).insert()
+    await refresh_section(current_user.id, 'educations')
     return education_created
 
 # update education
 @router.put('/{education_id}', response_model=Education)
 async def update_education(education_id: str, education: EducationCreate, current_user: User = Depends(get_current_user)):
-    updated_education = await Education.get(education_id)
-    if updated_education is None:
-        raise HTTPException(
-            status_code=404, 
-            detail=Error(
-                message='Education not found', 
-                status_code=404
-            ).model_dump()
-        )
-    if updated_education.user_id != ObjectId(current_user.id):
-        raise HTTPException(
-            status_code=403, 
-            detail=Error(
-                message='You are not allowed to update this education', 
-                status_code=403
-            ).model_dump()
-        )
-    for key, value in education.model_dump().items():
-        setattr(updated_education, key, value)
-    updated_education.updated_at = datetime.now(timezone.utc) # type: ignore
-    await updated_education.save()
+    updated_education = await update_owned_document(
+        Education, education_id, current_user.id, education.model_dump(), 'education'
+    )
+    await refresh_section(current_user.id, 'educations')
     return updated_education
 
 # delete education
@@ -75,4 +64,5 @@ async def delete_education(education_id: str, current_user: User = Depends(get_c
             ).model_dump()
         )
     await target_education.delete()
+    await refresh_section(current_user.id, 'educations')
     return {'message': 'Education deleted successfully'}
\ No newline at end of file
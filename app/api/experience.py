@@ -1,55 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Header, Response
+from typing import List, Optional
 from app.models.experience import Experience
 from app.schemas.experience import ExperienceCreate, ExperienceUpdate
 from app.utils.auth import get_current_user
 from app.models.user import User
-from datetime import datetime, timezone
 from bson import ObjectId
 from app.schemas.error import Error
+from app.utils.portfolio_snapshot import read_section, refresh_section
+from app.utils.http_cache import check_not_modified
+from app.utils.crud import update_owned_document
 from beanie import PydanticObjectId
 
 router = APIRouter()
 
 # get experiences by user id
 @router.get('/experiences/user/{user_id}', response_model=List[Experience])
-async def read_experiences_by_user(user_id: PydanticObjectId):
-    experiences = await Experience.find(Experience.user_id == user_id).to_list()
-    experiences.sort(key=lambda x: x.end_date if x.end_date else x.start_date, reverse=True)
-    return experiences
+async def read_experiences_by_user(user_id: PydanticObjectId, response: Response, if_none_match: Optional[str] = Header(None)):
+    not_modified, versions = await check_not_modified(response, if_none_match, user_id, 'experiences')
+    if not_modified:
+        return not_modified
+    return await read_section('experiences', user_id, versions['experiences'])
 
 # create experience
 @router.post('/experiences', response_model=Experience)
 async def create_experience(experience: ExperienceCreate, current_user: User = Depends(get_current_user)):
     new_experience = {**experience.model_dump(), 'user_id': current_user.id}
     experience_created = await Experience(**new_experience).insert()
+    await refresh_section(current_user.id, 'experiences')
     return experience_created
 
 # update experience
 @router.put('/experiences/{experience_id}', response_model=Experience)
 async def update_experience(experience_id: str, experience: ExperienceUpdate, current_user: User = Depends(get_current_user)):
-    updated_experience = await Experience.get(experience_id)
-    if updated_experience is None:
-        raise HTTPException(
-            status_code=404, 
-            detail=Error(
-                message='Experience not found', 
-                status_code=404
-            ).model_dump()
-        )
-    if updated_experience.user_id != ObjectId(current_user.id):
-        raise HTTPException(
-            status_code=403, 
-            detail=Error(
-                message='You are not allowed to update this experience', 
-                status_code=403
-            ).model_dump()
-        )
-    update_data = experience.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(updated_experience, key, value)
-    updated_experience.updated_at = datetime.now(timezone.utc) # type: ignore
-    await updated_experience.save()
+    updated_experience = await update_owned_document(
+        Experience, experience_id, current_user.id, experience.model_dump(exclude_unset=True), 'experience'
+    )
+    await refresh_section(current_user.id, 'experiences')
     return updated_experience
 
 # delete experience
@@ -73,4 +59,5 @@ async def delete_experience(experience_id: str, current_user: User = Depends(get
             ).model_dump()
         )
     await target_experience.delete()
+    await refresh_section(current_user.id, 'experiences')
     return {'message': 'Experience deleted successfully'}
\ No newline at end of file
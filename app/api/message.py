@@ -1,17 +1,49 @@
 import re
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from typing import List, Optional
 from ..models.message import Message
-from ..schemas.message import MessageCreatedByAuthenticatedUser, MessageCreatedByUnauthenticatedUser, MessageCreatedResponse, MessageResponse, MessageCountResponse, ReadMessageBody
+from ..models.conversation import Conversation
+from ..schemas.message import MessageCreatedByAuthenticatedUser, MessageCreatedByUnauthenticatedUser, MessageCreatedResponse, MessageResponse, MessageCountResponse, ReadMessageBody, DeleteConversationsBody
 from app.utils.auth import get_current_user
 from ..models.user import User
 from datetime import datetime, timezone
 from beanie import PydanticObjectId
+from pymongo import DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from app.schemas.error import Error
 from app.websocket import manager
+from app.utils.pagination import encode_cursor, before_cursor_filter
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+NEWEST_FIRST = {"created_at": -1, "_id": -1}
+
+def mailbox_filter(current_user: User) -> dict:
+    """Messages the user received or sent and has not deleted"""
+    return {
+        "$or": [
+            {
+                "recipientUserId": current_user.id,
+                "isDeletedForRecipient": False
+            },
+            {
+                "senderUserId": current_user.id,
+                "isDeletedForSender": False
+            }
+        ]
+    }
+
+def paginate(messages: List[Message], limit: int, response: Response) -> List[Message]:
+    """Trim the extra look-ahead item and advertise the next page cursor"""
+    if len(messages) > limit:
+        messages = messages[:limit]
+        last = messages[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+    return messages
+
 def evaluate_message_read_status(messages: List[Message], current_user: User):
     for message in messages:
         message.isRead = message.isRead or message.senderUserId == current_user.id
@@ -32,16 +64,20 @@ def serialize_message(message: Message) -> dict:
     return data
 
 
-async def find_or_create_conversation_id(
+def conversation_key(email_a: str, email_b: str) -> str:
+    """Order-independent key for the pair of participants"""
+    return "|".join(sorted(email.strip().lower() for email in (email_a, email_b)))
+
+
+async def find_legacy_conversation_id(
     sender_email: str,
     recipient_email: str,
     sender_user_id: Optional[PydanticObjectId] = None,
     recipient_user_id: Optional[PydanticObjectId] = None
-) -> PydanticObjectId:
+) -> Optional[PydanticObjectId]:
     """
-    Find existing conversationId between two participants, or create a new one.
-    Looks for messages where participants match (by email or userId).
-    Always returns a conversationId.
+    Find the conversationId of messages exchanged before the pair had a
+    Conversation document. Only runs once per pair of participants.
     """
     # Build query conditions for matching participants
     or_conditions = []
@@ -75,13 +111,81 @@ async def find_or_create_conversation_id(
         ]
     }).sort("-created_at").limit(1).to_list()
     
-    if existing_messages and len(existing_messages) > 0:
-        existing_message = existing_messages[0]
-        if existing_message and existing_message.conversationId:
-            return existing_message.conversationId
-    
-    # No existing conversation found, create a new conversationId
-    return PydanticObjectId()
+    if existing_messages and existing_messages[0].conversationId:
+        return existing_messages[0].conversationId
+    return None
+
+
+async def _upsert_conversation(
+    key: str,
+    conversation_id: PydanticObjectId,
+    sender_email: str,
+    recipient_email: str,
+    sender_user_id: Optional[PydanticObjectId],
+    recipient_user_id: Optional[PydanticObjectId],
+) -> Optional[PydanticObjectId]:
+    """
+    Upsert the Conversation of the pair `key`, with `conversation_id` if it is
+    new, and return its id. None if `conversation_id` belongs to another pair.
+    """
+    collection = Conversation.get_motor_collection()
+    current_time = datetime.now(timezone.utc)
+    try:
+        document = await collection.find_one_and_update(
+            {"participantKey": key},
+            {"$setOnInsert": {
+                "_id": conversation_id,
+                "participantEmails": sorted({sender_email.strip().lower(), recipient_email.strip().lower()}),
+                "participantUserIds": [user_id for user_id in (sender_user_id, recipient_user_id) if user_id],
+                "created_at": current_time,
+                "updated_at": current_time,
+            }},
+            upsert=True,
+            projection={"_id": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        # Either another request inserted the same pair between our find and
+        # upsert, or the _id is taken by another pair
+        document = await collection.find_one({"participantKey": key}, {"_id": 1})
+        if document is None:
+            return None
+    return PydanticObjectId(document["_id"])
+
+
+async def find_or_create_conversation_id(
+    sender_email: str,
+    recipient_email: str,
+    sender_user_id: Optional[PydanticObjectId] = None,
+    recipient_user_id: Optional[PydanticObjectId] = None
+) -> PydanticObjectId:
+    """
+    Find existing conversationId between two participants, or create a new one.
+    Resolved with a single lookup on the unique Conversation.participantKey;
+    the Conversation is upserted atomically so concurrent first messages
+    between the same pair share one conversationId.
+    Always returns a conversationId.
+    """
+    key = conversation_key(sender_email, recipient_email)
+    conversation = await Conversation.find_one(Conversation.participantKey == key)
+    if conversation is not None:
+        return conversation.id
+
+    # First message since conversations got their own collection: keep the
+    # id of any earlier thread between the pair, unless another Conversation
+    # already has it (the legacy lookup also matches by user ids, so a pair
+    # whose emails changed can map to another pair's thread)
+    legacy_id = await find_legacy_conversation_id(
+        sender_email, recipient_email, sender_user_id, recipient_user_id
+    )
+    participants = (sender_email, recipient_email, sender_user_id, recipient_user_id)
+    if legacy_id is not None:
+        conversation_id = await _upsert_conversation(key, legacy_id, *participants)
+        if conversation_id is not None:
+            return conversation_id
+    # A fresh ObjectId cannot be taken, so this upsert always resolves
+    conversation_id = await _upsert_conversation(key, PydanticObjectId(), *participants)
+    return conversation_id  # type: ignore
 
 
 async def notify_new_message(message_doc: Message, recipient_user_id: str, sender_user_id: Optional[str] = None):
@@ -89,9 +193,10 @@ async def notify_new_message(message_doc: Message, recipient_user_id: str, sende
         "event": "message:new",
         "payload": serialize_message(message_doc)
     }
-    await manager.send_personal_message(recipient_user_id, payload)
+    user_ids = [recipient_user_id]
     if sender_user_id and sender_user_id != recipient_user_id:
-        await manager.send_personal_message(sender_user_id, payload)
+        user_ids.append(sender_user_id)
+    await manager.send_to_users(user_ids, payload)
 
 
 async def notify_messages_read(message_ids: List[str], user_ids: List[str]):
@@ -101,8 +206,7 @@ async def notify_messages_read(message_ids: List[str], user_ids: List[str]):
             "messageIds": message_ids
         }
     }
-    for user_id in user_ids:
-        await manager.send_personal_message(user_id, payload)
+    await manager.send_to_users(user_ids, payload)
 
 @router.post('/send', response_model=MessageCreatedResponse)
 async def message(message: MessageCreatedByAuthenticatedUser, current_user: User = Depends(get_current_user)):
@@ -203,73 +307,136 @@ async def message(message: MessageCreatedByUnauthenticatedUser):
     return message_created
 
 @router.get('', response_model=List[MessageResponse])
-async def get_all_messages_list_for_user(current_user: User = Depends(get_current_user)):
-    """Get all messages received by the current user"""
-    messages = await Message.find({
-        "$or": [
-            {
-                "recipientUserId": current_user.id,
-                "isDeletedForRecipient": False
-            },
-            {
-                "senderUserId": current_user.id,
-                "isDeletedForSender": False
-            }
-        ]
-    }).to_list()
+async def get_all_messages_list_for_user(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    before: Optional[str] = Query(None, description=f"Cursor from the {NEXT_CURSOR_HEADER} header of the previous page"),
+    current_user: User = Depends(get_current_user)
+):
+    """Get messages received or sent by the current user, newest first, one page at a time"""
+    conditions = [mailbox_filter(current_user)]
+    cursor_filter = before_cursor_filter(before)
+    if cursor_filter:
+        conditions.append(cursor_filter)
+
+    messages = await Message.find({"$and": conditions}).sort(
+        [("created_at", DESCENDING), ("_id", DESCENDING)]
+    ).limit(limit + 1).to_list()
+
+    messages = paginate(messages, limit, response)
+    messages = evaluate_message_read_status(messages, current_user)
+    return messages
 
+@router.get('/conversations', response_model=List[MessageResponse])
+async def get_latest_message_per_conversation(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    before: Optional[str] = Query(None, description=f"Cursor from the {NEXT_CURSOR_HEADER} header of the previous page"),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the latest message of each of the current user's conversations, newest first"""
+    pipeline = [
+        {"$match": mailbox_filter(current_user)},
+        {"$sort": NEWEST_FIRST},
+        {"$group": {"_id": "$conversationId", "latest": {"$first": "$$ROOT"}}},
+        {"$replaceRoot": {"newRoot": "$latest"}},
+    ]
+    cursor_filter = before_cursor_filter(before)
+    if cursor_filter:
+        pipeline.append({"$match": cursor_filter})
+    pipeline += [
+        {"$sort": NEWEST_FIRST},
+        {"$limit": limit + 1},
+    ]
+
+    messages = await Message.aggregate(pipeline, projection_model=Message).to_list()
+
+    messages = paginate(messages, limit, response)
     messages = evaluate_message_read_status(messages, current_user)
     return messages
 
 @router.get("/count", response_model=MessageCountResponse)
 async def get_message_count(current_user: User = Depends(get_current_user)):
     """Get count of messages by the current user"""
-    messages = await Message.find({
-        "$or": [
-            {
-                "recipientUserId": current_user.id,
-                "isDeletedForRecipient": False
-            },
-            {
-                "senderUserId": current_user.id,
-                "isDeletedForSender": False
-            }
-        ]
-    }).to_list()
-
-    messages = evaluate_message_read_status(messages, current_user)
-    
-    read_count = len([message for message in messages if message.isRead])
-    unread_count = len([message for message in messages if not message.isRead])
-    total_count = len(messages)
+    # Counted server-side; messages the user sent always count as read
+    counts = await Message.aggregate([
+        {"$match": mailbox_filter(current_user)},
+        {"$group": {
+            "_id": None,
+            "total": {"$sum": 1},
+            "read": {"$sum": {"$cond": [
+                {"$or": ["$isRead", {"$eq": ["$senderUserId", current_user.id]}]},
+                1,
+                0
+            ]}}
+        }}
+    ]).to_list()
+
+    total_count = counts[0]["total"] if counts else 0
+    read_count = counts[0]["read"] if counts else 0
     
     return MessageCountResponse(
         read=read_count, 
-        unread=unread_count, 
+        unread=total_count - read_count, 
         total=total_count
     )
 
 @router.put('/read', response_model=dict)
 async def mark_message_as_read(read_message_body: ReadMessageBody, current_user: User = Depends(get_current_user)):
-    """Mark all messages in the list as read"""
-    message_ids = [PydanticObjectId(message_id) for message_id in read_message_body.messageIds]
-
-    await Message.find({
-        "$and": [
-            {"_id": {"$in": message_ids}},
-            {"recipientUserId": current_user.id},
-            {"isDeletedForRecipient": False}
-        ]
-    }).update({"$set": {"isRead": True, "updated_at": datetime.now(timezone.utc)}})
+    """
+    Mark messages as read: either the listed messageIds, or every message of
+    conversationId (optionally only up to and including upToMessageId)
+    """
+    unread_filter = {
+        "recipientUserId": current_user.id,
+        "isDeletedForRecipient": False,
+        "isRead": False
+    }
+    if read_message_body.conversationId is not None:
+        unread_filter["conversationId"] = read_message_body.conversationId
+        if read_message_body.upToMessageId is not None:
+            # The anchor must be a message of this conversation the current user takes part in
+            up_to_message = await Message.get_motor_collection().find_one(
+                {
+                    "_id": read_message_body.upToMessageId,
+                    "conversationId": read_message_body.conversationId,
+                    "$or": [
+                        {"senderUserId": current_user.id},
+                        {"recipientUserId": current_user.id}
+                    ]
+                },
+                {"created_at": 1}
+            )
+            if up_to_message is None:
+                raise HTTPException(
+                    status_code=404,
+                    detail=Error(
+                        message="Message is not found",
+                        status_code=404
+                    ).model_dump()
+                )
+            unread_filter["created_at"] = {"$lte": up_to_message["created_at"]}
+    if read_message_body.messageIds:
+        unread_filter["_id"] = {"$in": read_message_body.messageIds}
+
+    # Only the ids and senders of the messages that actually change are read
+    collection = Message.get_motor_collection()
+    unread_messages = await collection.find(unread_filter, {"_id": 1, "senderUserId": 1}).to_list(length=None)
+    if not unread_messages:
+        return {"message": "Messages marked as read successfully"}
+
+    message_ids = [message["_id"] for message in unread_messages]
+    await collection.update_many(
+        {"_id": {"$in": message_ids}},
+        {"$set": {"isRead": True, "updated_at": datetime.now(timezone.utc)}}
+    )
 
-    updated_messages = await Message.find({"_id": {"$in": message_ids}}).to_list()
-    message_ids_str = [str(msg.id) for msg in updated_messages]
     participant_ids = {str(current_user.id)}
-    for message in updated_messages:
-        if message.senderUserId:
-            participant_ids.add(str(message.senderUserId))
+    for message in unread_messages:
+        if message.get("senderUserId"):
+            participant_ids.add(str(message["senderUserId"]))
 
-    await notify_messages_read(message_ids_str, list(participant_ids))
+    await notify_messages_read([str(message_id) for message_id in message_ids], list(participant_ids))
 
     return {"message": "Messages marked as read successfully"}
 
@@ -287,18 +454,18 @@ async def delete_message(message_id: PydanticObjectId, current_user: User = Depe
             }
         ]
     })
-    message_found = False
+    deleted_flag = None
 
     # Message is sent by the current user
     if (message and message.senderUserId == current_user.id and not message.isDeletedForSender):
-        message_found = True
+        deleted_flag = "isDeletedForSender"
         message.isDeletedForSender = True
     
     elif (message and message.recipientUserId == current_user.id and not message.isDeletedForRecipient):
-        message_found = True
+        deleted_flag = "isDeletedForRecipient"
         message.isDeletedForRecipient = True
 
-    if not message_found:
+    if deleted_flag is None:
         raise HTTPException(
             status_code=400, 
             detail=Error(
@@ -310,63 +477,81 @@ async def delete_message(message_id: PydanticObjectId, current_user: User = Depe
     if message.isDeletedForSender and message.isDeletedForRecipient:
         await message.delete()
     else:
-        await message.save()
+        # $set only this user's flag so a concurrent delete by the other participant is kept
+        await message.set({deleted_flag: True})
     return {"message": "Message deleted successfully"}
 
-@router.delete("/conversation/{conversation_id}", response_model=dict)
-async def delete_conversation(conversation_id: PydanticObjectId, current_user: User = Depends(get_current_user)):
-    """Delete all messages in a conversation"""
-    # Find all messages in this conversation where the current user is a participant
-    messages = await Message.find({
-        "$and": [
-            {"conversationId": conversation_id},
+async def delete_conversations_for_user(conversation_ids: List[PydanticObjectId], current_user: User) -> int:
+    """
+    Soft-delete every message of the given conversations for the current user,
+    then permanently delete messages both parties have deleted.
+    Returns the number of messages newly deleted from the user's end, or
+    raises 404 if the user has no messages in any of the conversations.
+    """
+    in_conversations = {"conversationId": {"$in": conversation_ids}}
+    current_time = datetime.now(timezone.utc)
+    collection = Message.get_motor_collection()
+
+    # If current user is the sender, mark as deleted for sender
+    sender_result = await collection.update_many(
+        {**in_conversations, "senderUserId": current_user.id, "isDeletedForSender": False},
+        {"$set": {"isDeletedForSender": True, "updated_at": current_time}}
+    )
+    # If current user is the recipient, mark as deleted for recipient
+    recipient_result = await collection.update_many(
+        {**in_conversations, "recipientUserId": current_user.id, "isDeletedForRecipient": False},
+        {"$set": {"isDeletedForRecipient": True, "updated_at": current_time}}
+    )
+    deleted_count = sender_result.modified_count + recipient_result.modified_count
+
+    if deleted_count == 0:
+        # Nothing changed: either already deleted, or not the user's conversation
+        participant_message = await collection.find_one(
             {
+                **in_conversations,
                 "$or": [
                     {"senderUserId": current_user.id},
                     {"recipientUserId": current_user.id}
                 ]
-            }
-        ]
-    }).to_list()
-    
-    if not messages:
-        raise HTTPException(
-            status_code=404,
-            detail=Error(
-                message="Conversation not found or you don't have access to it",
-                status_code=404
-            ).model_dump()
+            },
+            {"_id": 1}
         )
-    
-    deleted_count = 0
-    
-    # Process each message in the conversation
-    for message in messages:
-        message_updated = False
-        
-        # If current user is the sender, mark as deleted for sender
-        if message.senderUserId == current_user.id and not message.isDeletedForSender:
-            message.isDeletedForSender = True
-            message_updated = True
-        
-        # If current user is the recipient, mark as deleted for recipient
-        if message.recipientUserId == current_user.id and not message.isDeletedForRecipient:
-            message.isDeletedForRecipient = True
-            message_updated = True
-        
-        # Only update/delete if message was actually modified
-        if message_updated:
-            # Count all messages deleted from user's end
-            deleted_count += 1
-            
-            # If both parties have deleted it, permanently delete the message
-            if message.isDeletedForSender and message.isDeletedForRecipient:
-                await message.delete()
-            else:
-                # Otherwise, just update the flags (soft delete)
-                await message.save()
-    
+        if participant_message is None:
+            raise HTTPException(
+                status_code=404,
+                detail=Error(
+                    message="Conversation not found or you don't have access to it",
+                    status_code=404
+                ).model_dump()
+            )
+        return 0
+
+    # If both parties have deleted it, permanently delete the message
+    await collection.delete_many({
+        **in_conversations,
+        "$or": [
+            {"senderUserId": current_user.id},
+            {"recipientUserId": current_user.id}
+        ],
+        "isDeletedForSender": True,
+        "isDeletedForRecipient": True
+    })
+    return deleted_count
+
+@router.delete("/conversation/{conversation_id}", response_model=dict)
+async def delete_conversation(conversation_id: PydanticObjectId, current_user: User = Depends(get_current_user)):
+    """Delete all messages in a conversation"""
+    deleted_count = await delete_conversations_for_user([conversation_id], current_user)
     return {
         "message": f"Conversation deleted successfully",
         "deleted_count": deleted_count
-    }
\ No newline at end of file
+    }
+
+@router.post("/conversation/delete", response_model=dict)
+async def delete_conversations(body: DeleteConversationsBody, current_user: User = Depends(get_current_user)):
+    """Delete all messages in several conversations at once"""
+    deleted_count = await delete_conversations_for_user(body.conversationIds, current_user)
+    return {
+        "message": f"Conversations deleted successfully",
+        "deleted_count": deleted_count
+    }
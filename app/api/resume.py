@@ -1,53 +1,56 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Header, HTTPException, Query, Request
 from fastapi.responses import Response
-from app.models.user import User
-from app.models.experience import Experience
-from app.models.education import Education
-from app.models.project import Project
-from app.models.skill import Skill
-from app.models.certification import Certification
-from app.models.award import Award
 from datetime import datetime
+import asyncio
 import tempfile
 from pathlib import Path
-from app.utils.latex_compiler import compile_latex_to_pdf
+from app.utils.latex_compiler import latex_compiler, LatexCompilerBusy
+from app.utils.pdf_cache import pdf_cache, latex_cache_key
+from app.utils.etag import make_etag, etag_matches
+from app.utils.profile_loader import load_full_profile
+from typing import Optional
 from app.ResumeGenerator.templates.resume import Resume
 from beanie import PydanticObjectId
 
 router = APIRouter()
 
+# How often to check whether the client is still waiting for a compile
+DISCONNECT_POLL_SECONDS = 0.5
+
+async def compile_unless_disconnected(request: Request, latex_content: str, output_dir: Path) -> Path:
+    """Compile the resume, cancelling pdflatex if the client goes away."""
+    compile_task = asyncio.ensure_future(latex_compiler.compile(latex_content, output_dir))
+    try:
+        while True:
+            done, _ = await asyncio.wait({compile_task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return compile_task.result()
+            if await request.is_disconnected():
+                raise HTTPException(status_code=499, detail="Client closed request")
+    finally:
+        if not compile_task.done():
+            compile_task.cancel()
+            # Wait for pdflatex to be killed before the temp dir is removed
+            await asyncio.wait({compile_task})
+
 @router.get('/latex')
-async def get_resume_latex(user_id: PydanticObjectId = Query(..., description="User ID for the resume to generate")):
+async def get_resume_latex(
+    request: Request,
+    user_id: PydanticObjectId = Query(..., description="User ID for the resume to generate"),
+    if_none_match: Optional[str] = Header(None),
+):
     """
     Generate and download resume PDF using LaTeX template for the specified user.
     This endpoint is public and does not require authentication.
     Anyone can download any user's resume by providing their user_id.
+    PDFs are cached by the hash of their LaTeX source, which is also the ETag.
     """
     try:
-        # Get user by ID
-        user = await User.get(user_id)
-        if user is None:
+        # Get the user and all sections concurrently
+        profile = await load_full_profile(user_id)
+        if profile is None:
             raise HTTPException(status_code=404, detail="User not found")
-        
-        # Get user data
-        user_data = user.model_dump(exclude={"hashed_password"})
-        
-        # Get all related data
-        
-        experiences = await Experience.find(Experience.user_id == user_id).to_list()
-        experiences.sort(key=lambda x: x.end_date if x.end_date else x.start_date, reverse=True)
-        
-        educations = await Education.find(Education.user_id == user_id).to_list()
-        educations.sort(key=lambda x: x.end_date if x.end_date else x.start_date, reverse=True)
-        
-        projects = await Project.find(Project.user_id == user_id).to_list()
-        projects.sort(key=lambda x: x.end_date if x.end_date else x.start_date, reverse=True)
-        
-        skills = await Skill.find(Skill.user_id == user_id).to_list()
-        
-        certifications = await Certification.find(Certification.user_id == user_id).to_list()
-        
-        awards = await Award.find(Award.user_id == user_id).to_list()
+        user_data = profile["user_data"]
         
         # Convert to dict format and format dates
         def format_date(date_obj):
@@ -58,38 +61,19 @@ async def get_resume_latex(user_id: PydanticObjectId = Query(..., description="U
             if hasattr(date_obj, 'strftime'):
                 return date_obj.strftime('%Y-%m-%d')
             return str(date_obj)
-        
-        experiences_data = []
-        for exp in experiences:
-            exp_dict = exp.model_dump()
-            exp_dict['start_date'] = format_date(exp.start_date)
-            exp_dict['end_date'] = format_date(exp.end_date) if exp.end_date else None
-            experiences_data.append(exp_dict)
-        
-        educations_data = []
-        for edu in educations:
-            edu_dict = edu.model_dump()
-            edu_dict['start_date'] = format_date(edu.start_date)
-            edu_dict['end_date'] = format_date(edu.end_date) if edu.end_date else None
-            educations_data.append(edu_dict)
-        
-        projects_data = []
-        for proj in projects:
-            proj_dict = proj.model_dump()
-            # Format dates the same way as experience (convert epoch to date string)
-            proj_dict['start_date'] = format_date(proj.start_date)
-            proj_dict['end_date'] = format_date(proj.end_date) if proj.end_date else None
-            projects_data.append(proj_dict)
-        
-        skills_data = [skill.model_dump() for skill in skills]
-        certifications_data = [cert.model_dump() for cert in certifications]
-        
-        awards_data = []
-        for award in awards:
-            award_dict = award.model_dump()
-            # Format issue_date the same way as other dates
-            award_dict['issue_date'] = format_date(award.issue_date) if award.issue_date else None
-            awards_data.append(award_dict)
+
+        def format_dates(items, *fields):
+            for item in items:
+                for field in fields:
+                    item[field] = format_date(item.get(field)) if item.get(field) else None
+            return items
+
+        experiences_data = format_dates(profile["experiences"], 'start_date', 'end_date')
+        educations_data = format_dates(profile["educations"], 'start_date', 'end_date')
+        projects_data = format_dates(profile["projects"], 'start_date', 'end_date')
+        skills_data = profile["skills"]
+        certifications_data = profile["certifications"]
+        awards_data = format_dates(profile["awards"], 'issue_date')
 
         latex_content = Resume().generate_resume(
             user_data=user_data,
@@ -101,29 +85,46 @@ async def get_resume_latex(user_id: PydanticObjectId = Query(..., description="U
             awards=awards_data
         )
         
-        # Create temporary directory for compilation
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            pdf_file = compile_latex_to_pdf(latex_content, temp_path)
-            
-            # Read PDF bytes
-            pdf_bytes = pdf_file.read_bytes()
-            
-            # Generate filename
-            first_name = user_data.get('first_name', '')
-            last_name = user_data.get('last_name', '')
-            filename = f"{first_name}_{last_name}_Resume.pdf".strip() or "Resume.pdf"
-            filename = filename.replace(' ', '_')
-            
-            # Return PDF as response
-            return Response(
-                content=pdf_bytes,
-                media_type="application/pdf",
-                headers={
-                    "Content-Disposition": f'attachment; filename="{filename}"'
-                }
-            )
+        # Generate filename
+        first_name = user_data.get('first_name', '')
+        last_name = user_data.get('last_name', '')
+        filename = f"{first_name}_{last_name}_Resume.pdf".strip() or "Resume.pdf"
+        filename = filename.replace(' ', '_')
+
+        cache_key = latex_cache_key(latex_content)
+        etag = make_etag(cache_key)
+        headers = {
+            "ETag": etag,
+            "Cache-Control": "no-cache",
+        }
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+
+        pdf_bytes = await asyncio.to_thread(pdf_cache.get, cache_key)
+        if pdf_bytes is None:
+            # Create temporary directory for compilation
+            with tempfile.TemporaryDirectory() as temp_dir:
+                temp_path = Path(temp_dir)
+                pdf_file = await compile_unless_disconnected(request, latex_content, temp_path)
+
+                # Read PDF bytes
+                pdf_bytes = pdf_file.read_bytes()
+            await asyncio.to_thread(pdf_cache.put, cache_key, pdf_bytes)
+
+        # Return PDF as response
+        return Response(
+            content=pdf_bytes,
+            media_type="application/pdf",
+            headers={
+                **headers,
+                "Content-Disposition": f'attachment; filename="{filename}"'
+            }
+        )
         
+    except HTTPException:
+        raise
+    except LatexCompilerBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except FileNotFoundError as e:
         raise HTTPException(status_code=500, detail=f"LaTeX template files not found: {str(e)}")
     except RuntimeError as e:
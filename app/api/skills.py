@@ -1,21 +1,26 @@
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Header, Response
 from app.models.skill import Skill
 from app.schemas.skill import SkillCreate, SkillUpdate
 from app.utils.auth import get_current_user
-from datetime import datetime, timezone
 from app.models.user import User
 from bson import ObjectId
 from app.schemas.error import Error
+from app.utils.portfolio_snapshot import read_section, refresh_section
+from app.utils.http_cache import check_not_modified
+from app.utils.crud import update_owned_document
 from beanie import PydanticObjectId
 
 router = APIRouter()
 
 # get skills by user id
 @router.get('/skills/user/{user_id}', response_model=List[Skill])
-async def read_skills_by_user(user_id: PydanticObjectId):
-    return await Skill.find(Skill.user_id == user_id).to_list()
+async def read_skills_by_user(user_id: PydanticObjectId, response: Response, if_none_match: Optional[str] = Header(None)):
+    not_modified, versions = await check_not_modified(response, if_none_match, user_id, 'skills')
+    if not_modified:
+        return not_modified
+    return await read_section('skills', user_id, versions['skills'])
 
 # create skill
 @router.post('/skills', response_model=Skill)
@@ -33,33 +38,17 @@ async def create_skill(skill: SkillCreate, current_user: User = Depends(get_curr
 
     new_skill = {**skill.model_dump(), 'user_id': current_user.id}
     skill_created = await Skill(**new_skill).insert()
+    await refresh_section(current_user.id, 'skills')
     return skill_created
 
 
 # update skill
 @router.put('/skills/{skill_id}', response_model=Skill)
 async def update_skill(skill_id: str, skill: SkillUpdate, current_user: User = Depends(get_current_user)):
-    updated_skill = await Skill.get(skill_id)
-    if updated_skill is None:
-        raise HTTPException(
-            status_code=404, 
-            detail=Error(
-                message='Skill not found', 
-                status_code=404
-            ).model_dump()
-        )
-    if updated_skill.user_id != ObjectId(current_user.id):
-        raise HTTPException(
-            status_code=403, 
-            detail=Error(
-                message='You are not allowed to update this skill', 
-                status_code=403
-            ).model_dump()
-        )
-    for key, value in skill.model_dump().items():
-        setattr(updated_skill, key, value)
-    updated_skill.updated_at = datetime.now(timezone.utc) # type: ignore
-    await updated_skill.save()
+    updated_skill = await update_owned_document(
+        Skill, skill_id, current_user.id, skill.model_dump(exclude_unset=True), 'skill'
+    )
+    await refresh_section(current_user.id, 'skills')
     return updated_skill
 
 # delete skill
@@ -83,4 +72,5 @@ async def delete_skill(skill_id: str, current_user: User = Depends(get_current_u
             ).model_dump()
         )
     await target_skill.delete()
+    await refresh_section(current_user.id, 'skills')
     return {'message': 'Skill deleted successfully'}
\ No newline at end of file
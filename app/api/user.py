@@ -1,31 +1,43 @@
-from fastapi import APIRouter, HTTPException
-from app.models.user import User
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from typing import Optional
+from app.models.daily_visit import DailyVisit
 from app.schemas.user import UserResponse
 from beanie import PydanticObjectId
-from datetime import datetime
+from datetime import timedelta
+from app.utils.portfolio_snapshot import read_user_fields
+from app.utils.http_cache import check_not_modified
+from app.utils.visitor_counter import visitor_counter, visit_day
 
 router = APIRouter()
 
 # get user by id
 @router.get('/user/{user_id}', response_model=UserResponse)
-async def get_user_by_id(user_id: PydanticObjectId):
-    user = await User.get(user_id)
-    if user is None:
+async def get_user_by_id(user_id: PydanticObjectId, response: Response, if_none_match: Optional[str] = Header(None)):
+    not_modified, versions = await check_not_modified(response, if_none_match, user_id, 'user')
+    if not_modified:
+        return not_modified
+    fields = await read_user_fields(user_id, versions['user'])
+    if fields is None:
         raise HTTPException(status_code=400, detail="User not found")
-    return user.model_dump(exclude={"hashed_password"})
+    # The visitor count is not versioned (see _user_fields), so it is read fresh
+    return {**fields["user"], "visitor_count": await visitor_counter.count(user_id) or 0}
 
 # increment visitor count
 @router.post('/user/{user_id}/increment-visitor')
 async def increment_visitor_count(user_id: PydanticObjectId):
-    user = await User.get(user_id)
-    if user is None:
+    # Atomic $inc (or buffered, see VisitorCounter) instead of a read-modify-write of the user
+    visitor_count = await visitor_counter.increment(user_id)
+    if visitor_count is None:
         raise HTTPException(status_code=400, detail="User not found")
     
-    # Increment visitor count
-    if user.visitor_count is None:
-        user.visitor_count = 0
-    user.visitor_count += 1
-    user.updated_at = datetime.now()
-    await user.save()
-    
-    return {"visitor_count": user.visitor_count}
\ No newline at end of file
+    return {"visitor_count": visitor_count}
+
+# get visits per day (UTC) over the last `days` days
+@router.get('/user/{user_id}/visits')
+async def get_daily_visits(user_id: PydanticObjectId, days: int = Query(30, ge=1, le=366)):
+    since = visit_day() - timedelta(days=days - 1)
+    buckets = await DailyVisit.get_motor_collection().find(
+        {"user_id": user_id, "day": {"$gte": since}},
+        {"_id": 0, "day": 1, "count": 1},
+    ).sort("day", 1).to_list(length=days)
+    return [{"day": bucket["day"].date().isoformat(), "count": bucket["count"]} for bucket in buckets]
\ No newline at end of file
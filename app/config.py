@@ -12,7 +12,66 @@ class Settings(BaseSettings):
     secret_key: str = "your-secret-key-here"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
-    
+
+    # Verified-token cache (set max size to 0 to disable)
+    token_cache_max_size: int = 10000
+    token_cache_ttl_seconds: int = 60
+
+    # How often buffered access token last_used_at updates are written
+    token_usage_flush_interval_seconds: int = 30
+
+    # Password hashing worker pool ("thread" or "process")
+    password_hash_executor: str = "thread"
+    password_hash_max_concurrency: int = 4
+
+    # LaTeX resume compilation
+    latex_max_workers: int = 2
+    latex_max_queued_jobs: int = 20
+    latex_compile_timeout_seconds: int = 60
+    latex_use_precompiled_preamble: bool = True
+    latex_format_dir: Optional[str] = None
+    # Reload resume templates when their files change (development only)
+    resume_template_auto_reload: bool = False
+
+    # Generated resume PDF cache (defaults to a directory under the system temp dir)
+    resume_pdf_cache_dir: Optional[str] = None
+    resume_pdf_cache_max_mb: int = 256
+
+    # WebSocket delivery: per-socket send queue and what to do when it is full
+    # ("disconnect" or "drop_oldest")
+    websocket_send_queue_size: int = 100
+    websocket_overflow_policy: str = "disconnect"
+    # How events reach sockets held by other workers: "memory" (single process)
+    # or "mongodb" (change stream, requires a replica set)
+    websocket_pubsub_backend: str = "memory"
+    # Application-level heartbeat (opt-in, 0 = off): send a ping event every
+    # interval and close sockets silent for the idle timeout. Clients must
+    # answer the ping event; protocol-level pings are done by uvicorn
+    websocket_ping_interval_seconds: int = 30
+    websocket_idle_timeout_seconds: int = 0
+    # Connection caps per worker (0 means unlimited)
+    websocket_max_connections_per_user: int = 10
+    websocket_max_connections: int = 10000
+    # Recent events kept per user for clients reconnecting with ?since=<seq>
+    websocket_replay_buffer_size: int = 100
+    websocket_replay_max_users: int = 10000
+
+    # HTTP caching of public portfolio reads: browsers always revalidate,
+    # shared caches (a CDN) may serve a response for the shared max age
+    portfolio_cache_max_age_seconds: int = 0
+    portfolio_cache_shared_max_age_seconds: int = 60
+
+    # Read-through cache of public portfolio sections ("memory" or "redis")
+    portfolio_section_cache_backend: str = "memory"
+    portfolio_section_cache_max_entries: int = 10000
+    portfolio_section_cache_ttl_seconds: int = 30
+    portfolio_section_cache_redis_url: Optional[str] = None
+
+    # Visitor counting: write every visit with $inc, or buffer them in memory
+    # and flush once per interval
+    visitor_count_buffered: bool = False
+    visitor_count_flush_interval_seconds: int = 5
+
     # CORS settings - can be set via environment variable as JSON array or comma-separated
     cors_origins: List[str] = ["http://localhost:3000", "http://127.0.0.1:3000"]
     
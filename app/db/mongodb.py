@@ -9,8 +9,36 @@ from app.models.award import Award
 from app.models.about import About
 from app.models.user import User
 from app.models.message import Message
+from app.models.conversation import Conversation
+from app.models.portfolio_snapshot import PortfolioSnapshot
+from app.models.portfolio_version import PortfolioVersion
+from app.models.daily_visit import DailyVisit
 from app.models.access_token import AccessToken
+from app.models.websocket_event import WebSocketEvent
 from app.config import settings
+from app.utils.token_cleanup import ensure_access_token_ttl_index
+from pymongo import IndexModel
+import logging
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_MODELS = [
+    User,
+    Project,
+    Skill,
+    Experience,
+    Education,
+    Certification,
+    Award,
+    About,
+    Message,
+    Conversation,
+    PortfolioSnapshot,
+    PortfolioVersion,
+    DailyVisit,
+    AccessToken,
+    WebSocketEvent,
+]
 
 async def init_db():
     # Construct MongoDB URL with database name
@@ -18,18 +46,52 @@ async def init_db():
     mongodb_url = settings.mongodb_url.rstrip('/')
     mongodb_url = f"{mongodb_url}/{settings.database_name}"
     client = AsyncIOMotorClient(mongodb_url)
+    database = client.get_default_database()
+    await ensure_access_token_ttl_index(database)
     await init_beanie(
-        database=client.get_default_database(), # type: ignore
-        document_models=[
-            User,
-            Project,
-            Skill,
-            Experience,
-            Education,
-            Certification,
-            Award,
-            About,
-            Message,
-            AccessToken,
-        ]
-    )
\ No newline at end of file
+        database=database, # type: ignore
+        document_models=DOCUMENT_MODELS
+    )
+
+    try:
+        await check_indexes(DOCUMENT_MODELS)
+    except Exception as e:
+        logger.error(f"Error checking indexes: {e}")
+
+def _declared_index_names(model) -> set:
+    names = {"_id_"}
+    for index in getattr(model.Settings, "indexes", []):
+        if isinstance(index, IndexModel):
+            names.add(index.document["name"])
+        elif isinstance(index, str):
+            names.add(f"{index}_1")
+    return names
+
+async def check_indexes(document_models) -> dict:
+    """
+    Report declared indexes that are missing from the database and existing
+    indexes that have not been used since the MongoDB server started.
+    Returns {collection: {"missing": [...], "unused": [...]}} and logs warnings.
+    """
+    report = {}
+    for model in document_models:
+        collection = model.get_motor_collection()
+        declared = _declared_index_names(model)
+        existing = {index["name"] async for index in collection.list_indexes()}
+        usage = {
+            stats["name"]: stats["accesses"]["ops"]
+            async for stats in collection.aggregate([{"$indexStats": {}}])
+        }
+
+        missing = sorted(declared - existing)
+        unused = sorted(name for name in existing if name != "_id_" and usage.get(name, 0) == 0)
+        undeclared = sorted(existing - declared)
+        report[collection.name] = {"missing": missing, "unused": unused, "undeclared": undeclared}
+
+        if missing:
+            logger.warning(f"Collection '{collection.name}' is missing indexes: {', '.join(missing)}")
+        if unused:
+            logger.info(f"Collection '{collection.name}' has unused indexes: {', '.join(unused)}")
+        if undeclared:
+            logger.info(f"Collection '{collection.name}' has indexes not declared on its model: {', '.join(undeclared)}")
+    return report
\ No newline at end of file
@@ -4,6 +4,10 @@ from fastapi.websockets import WebSocket
 from app.api import projects, skills, experience, educations, certifications, awards, about as portfolio, auth, user, message, resume
 from app.db.mongodb import init_db
 from app.utils.token_cleanup import cleanup_expired_access_tokens
+from app.utils.token_usage import token_usage
+from app.utils.visitor_counter import visitor_counter
+from app.utils.password_hasher import password_hasher
+from app.utils.latex_compiler import find_pdflatex
 from app.config import settings
 from contextlib import asynccontextmanager
 from app import websocket as websocket_routes
@@ -29,10 +33,46 @@ async def periodic_cleanup(interval_minutes: int = 1440):
         except Exception as e:
             logger.error(f"Error in periodic cleanup: {e}")
 
+async def periodic_token_usage_flush(interval_seconds: int = 30):
+    """
+    Periodically write buffered access token usage to the database.
+    Runs every `interval_seconds` seconds (default: 30).
+    """
+    while True:
+        try:
+            await asyncio.sleep(interval_seconds)
+            await token_usage.flush()
+        except asyncio.CancelledError:
+            logger.info("Token usage flush task cancelled")
+            break
+        except Exception as e:
+            logger.error(f"Error in token usage flush: {e}")
+
+async def periodic_visitor_count_flush(interval_seconds: int = 5):
+    """
+    Periodically write buffered visitor counts to the database.
+    Runs every `interval_seconds` seconds (default: 5).
+    """
+    while True:
+        try:
+            await asyncio.sleep(interval_seconds)
+            await visitor_counter.flush()
+        except asyncio.CancelledError:
+            logger.info("Visitor count flush task cancelled")
+            break
+        except Exception as e:
+            logger.error(f"Error in visitor count flush: {e}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await init_db()
+
+    # Start receiving WebSocket events published by any worker
+    await websocket_routes.manager.start()
+
+    # Locate pdflatex once instead of on every resume download
+    find_pdflatex()
     
     # Clean up expired tokens on startup
     try:
@@ -44,15 +84,44 @@ async def lifespan(app: FastAPI):
     
     # Start periodic cleanup task (runs every 24 hours)
     cleanup_task = asyncio.create_task(periodic_cleanup(interval_minutes=1440))
+
+    # Start write-behind flushing of token last_used_at updates
+    usage_flush_task = asyncio.create_task(
+        periodic_token_usage_flush(interval_seconds=settings.token_usage_flush_interval_seconds)
+    )
+
+    # Start write-behind flushing of visitor counts, when they are buffered
+    background_tasks = [cleanup_task, usage_flush_task]
+    if visitor_counter.buffered:
+        background_tasks.append(asyncio.create_task(
+            periodic_visitor_count_flush(interval_seconds=settings.visitor_count_flush_interval_seconds)
+        ))
     
     yield
     
     # Shutdown
-    cleanup_task.cancel()
+    for task in background_tasks:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    await websocket_routes.manager.stop()
+
+    # Write any token usage still buffered in memory
     try:
-        await cleanup_task
-    except asyncio.CancelledError:
-        pass
+        await token_usage.flush()
+    except Exception as e:
+        logger.error(f"Error flushing token usage on shutdown: {e}")
+
+    # Write any visits still buffered in memory
+    try:
+        await visitor_counter.flush()
+    except Exception as e:
+        logger.error(f"Error flushing visitor counts on shutdown: {e}")
+
+    password_hasher.shutdown()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -61,7 +130,8 @@ app.add_middleware(
     allow_origins=settings.cors_origins,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-    allow_headers=["Content-Type", "Authorization", "Accept"],
+    allow_headers=["Content-Type", "Authorization", "Accept", "If-None-Match"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 app.include_router(projects.router)
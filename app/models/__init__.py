@@ -6,3 +6,8 @@ from .experience import Experience
 from .project import Project
 from .skill import Skill
 from .message import Message
+from .conversation import Conversation
+from .portfolio_snapshot import PortfolioSnapshot
+from .portfolio_version import PortfolioVersion
+from .daily_visit import DailyVisit
+from .websocket_event import WebSocketEvent
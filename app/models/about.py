@@ -14,4 +14,7 @@ class About(Document):
     updated_at: datetime = datetime.now(timezone.utc)
 
     class Settings:
-        name = "about"
\ No newline at end of file
+        name = "about"
+        indexes = [
+            "user_id",
+        ]
\ No newline at end of file
@@ -2,6 +2,7 @@ from beanie import Document
 from datetime import datetime, timezone, timedelta
 from typing import Optional
 from beanie import PydanticObjectId
+from pymongo import ASCENDING, IndexModel
 
 class AccessToken(Document):
     """Model to store active access tokens in the database"""
@@ -18,5 +19,6 @@ class AccessToken(Document):
         indexes = [
             "token",  # Index for fast lookup
             "user_id",  # Index for user-based queries
-            "expires_at",  # Index for cleanup of expired tokens
+            # TTL index: MongoDB removes tokens once expires_at has passed
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
         ]
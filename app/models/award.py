@@ -1,4 +1,5 @@
 from beanie import Document, PydanticObjectId
+from pymongo import ASCENDING, IndexModel
 from datetime import datetime, timezone
 
 class Award(Document):
@@ -15,4 +16,6 @@ class Award(Document):
         name = "awards"
         indexes = [
             "name",
+            # Public section reads filter by user
+            IndexModel([("user_id", ASCENDING), ("name", ASCENDING)]),
         ]
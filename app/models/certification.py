@@ -1,4 +1,5 @@
 from beanie import Document, PydanticObjectId
+from pymongo import ASCENDING, IndexModel
 from datetime import datetime, timezone
 
 class Certification(Document):
@@ -16,4 +17,6 @@ class Certification(Document):
         name = "certifications"
         indexes = [
             "name",
+            # Public section reads filter by user
+            IndexModel([("user_id", ASCENDING), ("name", ASCENDING)]),
         ]
\ No newline at end of file
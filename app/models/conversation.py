@@ -0,0 +1,20 @@
+from beanie import Document, PydanticObjectId
+from datetime import datetime, timezone
+from typing import List
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+
+
+class Conversation(Document):
+    """One document per pair of participants; its id is the messages' conversationId"""
+    participantKey: str  # Canonical, order-independent key built from both participants' emails
+    participantEmails: List[str]
+    participantUserIds: List[PydanticObjectId] = []
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "conversations"
+        indexes = [
+            IndexModel([("participantKey", ASCENDING)], unique=True),
+        ]
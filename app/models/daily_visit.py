@@ -0,0 +1,16 @@
+from beanie import Document, PydanticObjectId
+from datetime import datetime
+from pymongo import ASCENDING, IndexModel
+
+
+class DailyVisit(Document):
+    """Portfolio visits of one user on one day (UTC)"""
+    user_id: PydanticObjectId
+    day: datetime  # Midnight UTC of the day
+    count: int = 0
+
+    class Settings:
+        name = "daily_visits"
+        indexes = [
+            IndexModel([("user_id", ASCENDING), ("day", ASCENDING)], unique=True),
+        ]
@@ -1,4 +1,5 @@
 from beanie import Document, PydanticObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from datetime import datetime, timezone
 from typing import Optional
 
@@ -16,4 +17,6 @@ class Education(Document):
         name = "educations"
         indexes = [
             "institution",
+            # Public section reads filter by user and sort newest first
+            IndexModel([("user_id", ASCENDING), ("end_date", DESCENDING), ("start_date", DESCENDING)]),
         ]
\ No newline at end of file
@@ -2,6 +2,7 @@ from beanie import Document, PydanticObjectId
 from datetime import datetime, timezone
 from typing import Optional
 from pydantic import Field
+from pymongo import ASCENDING, DESCENDING, IndexModel
 
 
 class Message(Document):
@@ -21,4 +22,19 @@ class Message(Document):
     isRead: bool = False
 
     class Settings:
-        name = "message"
\ No newline at end of file
+        name = "message"
+        indexes = [
+            # Inbox listing: each side of the mailbox $or, newest first
+            IndexModel([
+                ("recipientUserId", ASCENDING),
+                ("isDeletedForRecipient", ASCENDING),
+                ("created_at", DESCENDING),
+                ("_id", DESCENDING),
+            ]),
+            IndexModel([
+                ("senderUserId", ASCENDING),
+                ("isDeletedForSender", ASCENDING),
+                ("created_at", DESCENDING),
+                ("_id", DESCENDING),
+            ]),
+        ]
\ No newline at end of file
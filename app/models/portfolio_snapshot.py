@@ -0,0 +1,26 @@
+from beanie import Document, PydanticObjectId
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from pydantic import Field
+
+
+class PortfolioSnapshot(Document):
+    """
+    Denormalized read model of a user's public portfolio page; its id is the
+    user's id. Each field holds a section exactly as its own endpoint returns it.
+    `versions` holds the PortfolioVersion counter each section was loaded at.
+    """
+    id: Optional[PydanticObjectId] = None  # type: ignore
+    portfolio: Dict[str, Any] = {}
+    user: Dict[str, Any] = {}
+    projects: List[Dict[str, Any]] = []
+    skills: List[Dict[str, Any]] = []
+    experiences: List[Dict[str, Any]] = []
+    educations: List[Dict[str, Any]] = []
+    certifications: List[Dict[str, Any]] = []
+    awards: List[Dict[str, Any]] = []
+    versions: Dict[str, int] = {}
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "portfolio_snapshots"
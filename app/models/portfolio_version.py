@@ -0,0 +1,20 @@
+from beanie import Document, PydanticObjectId
+from typing import Optional
+
+
+class PortfolioVersion(Document):
+    """
+    Per-user counters bumped on every write to a portfolio section; its id is
+    the user's id. They version the public read endpoints for ETags.
+    """
+    id: Optional[PydanticObjectId] = None  # type: ignore
+    user: int = 0
+    projects: int = 0
+    skills: int = 0
+    experiences: int = 0
+    educations: int = 0
+    certifications: int = 0
+    awards: int = 0
+
+    class Settings:
+        name = "portfolio_versions"
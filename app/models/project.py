@@ -1,4 +1,5 @@
 from beanie import Document, PydanticObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from datetime import datetime, timezone, date
 from typing import List, Optional
 
@@ -19,4 +20,6 @@ class Project(Document):
         name = "projects"
         indexes = [
             "title",
+            # Public section reads filter by user and sort newest first
+            IndexModel([("user_id", ASCENDING), ("end_date", DESCENDING), ("start_date", DESCENDING)]),
         ]
\ No newline at end of file
@@ -1,4 +1,5 @@
 from beanie import Document, PydanticObjectId
+from pymongo import ASCENDING, IndexModel
 from datetime import datetime, timezone
 
 class Skill(Document):
@@ -13,4 +14,6 @@ class Skill(Document):
         name = "skills"
         indexes = [
             "name",
+            # Public section reads and duplicate checks filter by user and name
+            IndexModel([("user_id", ASCENDING), ("name", ASCENDING)]),
         ]
\ No newline at end of file
@@ -0,0 +1,19 @@
+from beanie import Document
+from datetime import datetime, timezone
+from typing import List, Optional
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+
+
+class WebSocketEvent(Document):
+    """A WebSocket event published to every API worker through a change stream"""
+    user_ids: Optional[List[str]] = None  # Recipients; None means every connected user
+    text: str  # The event, already serialized to JSON
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "websocket_events"
+        indexes = [
+            # Events are only needed while workers consume them; keep them briefly
+            IndexModel([("created_at", ASCENDING)], expireAfterSeconds=300),
+        ]
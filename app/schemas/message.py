@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, model_validator
 from datetime import datetime
 from typing import Optional, List
 from beanie import PydanticObjectId
@@ -39,5 +39,18 @@ class MessageCountResponse(BaseModel):
     unread: int
     total: int
 
+class DeleteConversationsBody(BaseModel):
+    conversationIds: List[PydanticObjectId] = Field(min_length=1, description="List of conversation IDs to delete")
+
 class ReadMessageBody(BaseModel):
-    messageIds: List[PydanticObjectId] = Field(description="List of message IDs to mark as read")
\ No newline at end of file
+    messageIds: List[PydanticObjectId] = Field(default_factory=list, description="List of message IDs to mark as read")
+    conversationId: Optional[PydanticObjectId] = Field(None, description="Mark the whole conversation as read instead of listing message IDs")
+    upToMessageId: Optional[PydanticObjectId] = Field(None, description="With conversationId, only mark messages up to and including this one")
+
+    @model_validator(mode="after")
+    def check_target(self):
+        if not self.messageIds and self.conversationId is None:
+            raise ValueError("Either messageIds or conversationId is required")
+        if self.upToMessageId is not None and self.conversationId is None:
+            raise ValueError("upToMessageId requires conversationId")
+        return self
\ No newline at end of file
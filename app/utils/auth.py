@@ -1,11 +1,13 @@
 from datetime import datetime, timedelta, timezone
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from app.models.user import User
 from app.models.access_token import AccessToken
 from app.config import settings
+from app.utils.token_cache import token_cache
+from app.utils.token_usage import token_usage
+from app.utils.password_hasher import pwd_context, password_hasher
 from beanie import PydanticObjectId
 from bson import ObjectId
 import re
@@ -27,9 +29,6 @@ if SECRET_KEY == "your-secret-key-here" or SECRET_KEY == "your-256-bit-secret-ke
         UserWarning
     )
 
-# Password hashing
-pwd_context = CryptContext(schemes=["sha256_crypt"], deprecated="auto")
-
 async def create_access_token(data: dict, user_id: PydanticObjectId, expires_delta: timedelta = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)) -> str:
     """Create a JWT access token and store it in the database."""
     to_encode = data.copy()
@@ -49,27 +48,6 @@ async def create_access_token(data: dict, user_id: PydanticObjectId, expires_del
     
     return token
 
-async def is_token_valid(token: str) -> bool:
-    """Check if a token exists in the database (not deleted)."""
-    token_doc = await AccessToken.find_one(AccessToken.token == token)
-    if token_doc is None:
-        return False
-    
-    # Check if token has expired
-    current_time = datetime.now(timezone.utc)
-    # Ensure expires_at is timezone-aware for comparison
-    expires_at = token_doc.expires_at
-    if expires_at.tzinfo is None:
-        # If timezone-naive, assume it's UTC
-        expires_at = expires_at.replace(tzinfo=timezone.utc)
-    
-    if expires_at < current_time:
-        # Auto-delete expired token
-        await token_doc.delete()
-        return False
-    
-    return True
-
 def verify_token(token: str) -> dict | None:
     """Verify a JWT token and return the payload, or None if invalid."""
     try:
@@ -85,16 +63,31 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     payload = verify_token(token)
     if payload is None:
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    
+
+    # Recently verified tokens skip the database entirely
+    cached = token_cache.get(token)
+    if cached is not None:
+        cached_user, token_id = cached
+        token_usage.touch(token_id)
+        return cached_user
+
     # Check if token exists in database (not deleted)
-    if not await is_token_valid(token):
-        raise HTTPException(status_code=401, detail="Token has been revoked or expired")
-    
-    # Update last_used_at timestamp
     token_doc = await AccessToken.find_one(AccessToken.token == token)
-    if token_doc:
-        token_doc.last_used_at = datetime.now(timezone.utc)
-        await token_doc.save()
+    if token_doc is None:
+        raise HTTPException(status_code=401, detail="Token has been revoked or expired")
+
+    current_time = datetime.now(timezone.utc)
+    expires_at = token_doc.expires_at
+    if expires_at.tzinfo is None:
+        # If timezone-naive, assume it's UTC
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    if expires_at < current_time:
+        # Auto-delete expired token
+        await token_doc.delete()
+        raise HTTPException(status_code=401, detail="Token has been revoked or expired")
+
+    # Update last_used_at timestamp (written in batches by the usage buffer)
+    token_usage.touch(token_doc.id, current_time)  # type: ignore
     
     username = payload.get("username")
     user = await User.find_one(User.username == username)
@@ -104,6 +97,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     if user.is_active is False:
         raise HTTPException(status_code=401, detail="Inactive user")
 
+    token_cache.set(token, user, token_doc.id, expires_at)  # type: ignore
     return user
 
 def require_role(required_role: str):
@@ -0,0 +1,67 @@
+"""
+Shared helpers for the CRUD routers.
+Updates are one find_one_and_update that `$set`s only the fields sent, with
+the ownership check folded into the filter, instead of a load, setattr on
+every field and a full-document save().
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Type, TypeVar
+from beanie import Document, PydanticObjectId, UpdateResponse
+from bson.errors import InvalidId
+from fastapi import HTTPException
+from app.schemas.error import Error
+
+DocumentType = TypeVar("DocumentType", bound=Document)
+
+async def update_fields(model: Type[DocumentType], filters: Dict[str, Any], update_data: Dict[str, Any]) -> Optional[DocumentType]:
+    """
+    `$set` `update_data` on the document matching `filters` in one round trip.
+    Returns the updated document, or None if nothing matched.
+    """
+    return await model.find_one(filters).update(
+        {"$set": update_data},
+        response_type=UpdateResponse.NEW_DOCUMENT,
+    )
+
+async def update_owned_document(
+    model: Type[DocumentType],
+    document_id: str,
+    owner_id: PydanticObjectId,
+    update_data: Dict[str, Any],
+    name: str,
+) -> DocumentType:
+    """
+    Update the fields in `update_data` (and `updated_at`) of the `model`
+    document `document_id` if it belongs to `owner_id`, and return it.
+    Raises 404 if it does not exist and 403 if it belongs to someone else;
+    telling those apart costs a second query, but only on failure.
+    """
+    not_found = HTTPException(
+        status_code=404,
+        detail=Error(
+            message=f'{name.capitalize()} not found',
+            status_code=404
+        ).model_dump()
+    )
+    try:
+        object_id = PydanticObjectId(document_id)
+    except (InvalidId, TypeError):
+        raise not_found
+
+    updated = await update_fields(
+        model,
+        {"_id": object_id, "user_id": owner_id},
+        {**update_data, "updated_at": datetime.now(timezone.utc)},
+    )
+    if updated is not None:
+        return updated
+
+    if await model.get_motor_collection().count_documents({"_id": object_id}, limit=1) == 0:
+        raise not_found
+    raise HTTPException(
+        status_code=403,
+        detail=Error(
+            message=f'You are not allowed to update this {name}',
+            status_code=403
+        ).model_dump()
+    )
@@ -0,0 +1,23 @@
+"""Helpers for ETag / If-None-Match conditional requests."""
+from typing import Optional
+
+
+def make_etag(value: str, weak: bool = False) -> str:
+    """Quote `value` as an entity tag."""
+    return f'W/"{value}"' if weak else f'"{value}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Return True if the If-None-Match header matches `etag`.
+    Uses weak comparison, as RFC 9110 requires for If-None-Match.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        if candidate.strip().removeprefix("W/") == opaque:
+            return True
+    return False
@@ -0,0 +1,67 @@
+"""
+HTTP caching for the public portfolio read endpoints.
+Every write to a section bumps that section's counter in the user's
+PortfolioVersion document. Reads build a weak ETag from the counters with one
+lookup by _id, and answer a matching If-None-Match with 304 before running
+the section query. The versions read are handed back, so the data can be
+served from caches only if it is of those versions.
+"""
+from typing import Dict, Optional, Tuple
+from beanie import PydanticObjectId
+from fastapi import Response
+from pymongo import ReturnDocument
+from app.models.portfolio_version import PortfolioVersion
+from app.utils.etag import make_etag, etag_matches
+from app.config import settings
+
+# The versioned parts of a portfolio; "user" covers the user and portfolio fields
+PORTFOLIO_SECTIONS = ["user", "projects", "skills", "experiences", "educations", "certifications", "awards"]
+
+async def bump_version(user_id: PydanticObjectId, section: str) -> int:
+    """Record a write to a section, changing the ETag of its reads. Returns the new version."""
+    document = await PortfolioVersion.get_motor_collection().find_one_and_update(
+        {"_id": user_id},
+        {"$inc": {section: 1}},
+        projection={section: 1},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return document[section]
+
+async def get_versions(user_id: PydanticObjectId) -> Dict[str, int]:
+    document = await PortfolioVersion.get_motor_collection().find_one({"_id": user_id}) or {}
+    return {section: document.get(section, 0) for section in PORTFOLIO_SECTIONS}
+
+def portfolio_etag(user_id: PydanticObjectId, versions: Dict[str, int], *sections: str) -> str:
+    """Weak ETag for a response built from the given sections, at `versions`, of a user's portfolio"""
+    return make_etag("-".join([str(user_id), *(f"{section}.{versions[section]}" for section in sections)]), weak=True)
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    return {
+        "ETag": etag,
+        "Cache-Control": (
+            f"public, max-age={settings.portfolio_cache_max_age_seconds}, "
+            f"s-maxage={settings.portfolio_cache_shared_max_age_seconds}"
+        ),
+    }
+
+async def check_not_modified(
+    response: Response,
+    if_none_match: Optional[str],
+    user_id: PydanticObjectId,
+    *sections: str,
+) -> Tuple[Optional[Response], Dict[str, int]]:
+    """
+    Set the caching headers on `response`. Returns a 304 response to send
+    instead if the client's copy is current, else None, and the versions the
+    ETag was built from.
+    The version is read before the data, so a concurrent write can only make
+    the data newer than its ETag, never older; cached data must be of these
+    versions to be served.
+    """
+    versions = await get_versions(user_id)
+    headers = cache_headers(portfolio_etag(user_id, versions, *sections))
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers), versions
+    response.headers.update(headers)
+    return None, versions
@@ -1,27 +1,81 @@
 """Utility functions for compiling LaTeX to PDF"""
+import asyncio
+import hashlib
+import logging
+import re
+import shutil
 import subprocess
+import tempfile
 from pathlib import Path
-from datetime import timezone
+from typing import Dict, List, Optional
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PDFLATEX_NOT_FOUND = "pdflatex not found. Please install LaTeX (e.g., texlive-full or MacTeX)"
+
+BEGIN_DOCUMENT = "\\begin{document}"
+
+# pdflatex passes per compile; the second only runs when the log asks for it
+MAX_PASSES = 2
+RERUN_PATTERN = re.compile(r"Rerun to get|Please rerun|Label\(s\) may have changed")
+# What pdflatex prints when a format file is missing, corrupt or was dumped by another build
+FORMAT_ERROR_PATTERN = re.compile(r"I can't find the format file|Fatal format file error|---! .*\.fmt")
+
+_pdflatex_path: Optional[str] = None
+
+
+def find_pdflatex(refresh: bool = False) -> Optional[str]:
+    """Locate pdflatex once and cache the path (call at startup)."""
+    global _pdflatex_path
+    if _pdflatex_path is None or refresh:
+        _pdflatex_path = shutil.which('pdflatex')
+        if _pdflatex_path is None:
+            logger.warning(PDFLATEX_NOT_FOUND)
+    return _pdflatex_path
+
+
+def _pdflatex_command(pdflatex: str, tex_file: Path, output_dir: Path) -> List[str]:
+    return [pdflatex, '-interaction=nonstopmode', '-output-directory', str(output_dir), str(tex_file)]
+
+
+def _needs_rerun(log_file: Path) -> bool:
+    try:
+        log = log_file.read_text(encoding='utf-8', errors='replace')
+    except FileNotFoundError:
+        return False
+    return RERUN_PATTERN.search(log) is not None
+
+
+def _compilation_error(run_num: int, returncode: int, stdout: str, stderr: str) -> RuntimeError:
+    error_msg = f"LaTeX compilation failed (run {run_num + 1}):\n"
+    error_msg += f"Return code: {returncode}\n"
+    # Get last part of output for debugging
+    stdout_tail = stdout[-3000:] if len(stdout) > 3000 else stdout
+    stderr_tail = stderr[-3000:] if len(stderr) > 3000 else stderr
+    error_msg += f"STDOUT (last 3000 chars):\n{stdout_tail}\n"
+    error_msg += f"STDERR (last 3000 chars):\n{stderr_tail}\n"
+    return RuntimeError(error_msg)
 
 
 def compile_latex_to_pdf(latex_content: str, output_dir: Path) -> Path:
-    """Compile LaTeX content to PDF using pdflatex"""
+    """Compile LaTeX content to PDF using pdflatex (blocking; prefer LatexCompiler in async code)"""
     # Write LaTeX file
     tex_file = output_dir / "resume.tex"
     tex_file.write_text(latex_content, encoding='utf-8')
-    
+
     # Compile LaTeX to PDF
     try:
         # Check if pdflatex is available
-        pdflatex_check = subprocess.run(['which', 'pdflatex'], capture_output=True, text=True)
-        if pdflatex_check.returncode != 0:
-            raise RuntimeError("pdflatex not found. Please install LaTeX (e.g., texlive-full or MacTeX)")
-        
+        pdflatex = find_pdflatex()
+        if pdflatex is None:
+            raise RuntimeError(PDFLATEX_NOT_FOUND)
+
         # Run pdflatex twice for proper references
         pdf_file = output_dir / "resume.pdf"
         for run_num in range(2):
             result = subprocess.run(
-                ['pdflatex', '-interaction=nonstopmode', '-output-directory', str(output_dir), str(tex_file)],
+                _pdflatex_command(pdflatex, tex_file, output_dir),
                 capture_output=True,
                 text=True,
                 cwd=str(output_dir),
@@ -29,7 +83,7 @@ def compile_latex_to_pdf(latex_content: str, output_dir: Path) -> Path:
                 encoding='utf-8',
                 errors='replace'  # Replace invalid UTF-8 characters instead of failing
             )
-            
+
             # Check if PDF was generated (even if returncode is non-zero)
             # LaTeX often returns non-zero on warnings but still generates PDF
             if pdf_file.exists():
@@ -37,23 +91,223 @@ def compile_latex_to_pdf(latex_content: str, output_dir: Path) -> Path:
                 break
             elif result.returncode != 0:
                 # Only fail if PDF wasn't generated AND there was an error
-                error_msg = f"LaTeX compilation failed (run {run_num + 1}):\n"
-                error_msg += f"Return code: {result.returncode}\n"
-                # Get last part of output for debugging
-                stdout_tail = result.stdout[-3000:] if len(result.stdout) > 3000 else result.stdout
-                stderr_tail = result.stderr[-3000:] if len(result.stderr) > 3000 else result.stderr
-                error_msg += f"STDOUT (last 3000 chars):\n{stdout_tail}\n"
-                error_msg += f"STDERR (last 3000 chars):\n{stderr_tail}\n"
-                raise RuntimeError(error_msg)
-        
+                raise _compilation_error(run_num, result.returncode, result.stdout, result.stderr)
+
         # Final check that PDF exists
         if not pdf_file.exists():
             raise FileNotFoundError("PDF file was not generated after compilation")
-        
+
         return pdf_file
     except subprocess.TimeoutExpired:
         raise RuntimeError("LaTeX compilation timed out after 60 seconds")
     except FileNotFoundError as e:
         if "pdflatex" in str(e):
-            raise RuntimeError("pdflatex not found. Please install LaTeX (e.g., texlive-full or MacTeX)")
+            raise RuntimeError(PDFLATEX_NOT_FOUND)
         raise
+
+
+class LatexCompilerBusy(RuntimeError):
+    """Raised when the compile queue is full."""
+
+
+class LatexCompileTimeout(RuntimeError):
+    """Raised when a job runs out of its time budget."""
+
+
+def _time_left(deadline: float) -> float:
+    left = deadline - asyncio.get_running_loop().time()
+    if left <= 0:
+        raise LatexCompileTimeout("LaTeX compilation timed out")
+    return left
+
+
+class LatexCompiler:
+    """
+    Compiles LaTeX with asyncio subprocesses so the event loop is never blocked.
+
+    At most `max_workers` pdflatex processes run at once and at most
+    `max_queue` jobs wait for a slot; beyond that `LatexCompilerBusy` is raised.
+    Each job has its own timeout, covering all of its pdflatex runs, and
+    cancelling the awaiting task (e.g. when the client disconnects) kills the
+    running pdflatex process.
+
+    When `format_dir` is set, the preamble (everything before
+    \\begin{document}) is dumped once into a precompiled `.fmt` file keyed by
+    its hash, and each compile only has to typeset the body. If the format
+    cannot be built or used, the full document is compiled instead, within
+    what is left of the timeout; the format is only dropped when pdflatex
+    reports the format file itself as unusable.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_queue: int = 20,
+        timeout_seconds: float = 60,
+        format_dir: Optional[Path] = None,
+    ) -> None:
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout_seconds = timeout_seconds
+        self.format_dir = Path(format_dir) if format_dir else None
+        self._semaphore = asyncio.Semaphore(max_workers)
+        self._waiting = 0
+        self._running = 0
+        # Preamble hash -> format file, or None if building it failed
+        self._formats: Dict[str, Optional[Path]] = {}
+        self._format_locks: Dict[str, asyncio.Lock] = {}
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "running": self._running,
+            "queue_depth": self._waiting,
+            "formats": sum(1 for fmt in self._formats.values() if fmt is not None),
+        }
+
+    async def _run_pdflatex(self, command: List[str], cwd: Path, timeout: float):
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            cwd=str(cwd),
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise LatexCompileTimeout(f"LaTeX compilation timed out after {timeout:g} seconds")
+        except BaseException:
+            # Cancellation: do not leave pdflatex running
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            raise
+        return (
+            process.returncode,
+            stdout.decode('utf-8', errors='replace'),
+            stderr.decode('utf-8', errors='replace'),
+        )
+
+    async def _run_passes(self, command: List[str], output_dir: Path, pdf_file: Path, deadline: float) -> Path:
+        """Run pdflatex, with a second pass only if the log asks for a rerun"""
+        log_file = pdf_file.with_suffix('.log')
+        for run_num in range(MAX_PASSES):
+            returncode, stdout, stderr = await self._run_pdflatex(command, output_dir, _time_left(deadline))
+
+            # LaTeX often returns non-zero on warnings but still generates PDF
+            if not pdf_file.exists():
+                if returncode != 0:
+                    raise _compilation_error(run_num, returncode, stdout, stderr)
+                continue
+            if not _needs_rerun(log_file):
+                break
+
+        # Final check that PDF exists
+        if not pdf_file.exists():
+            raise FileNotFoundError("PDF file was not generated after compilation")
+
+        return pdf_file
+
+    async def _get_format(self, pdflatex: str, preamble: str, deadline: float) -> Optional[Path]:
+        """Return the precompiled format for `preamble`, building it on first use"""
+        if self.format_dir is None:
+            return None
+        key = hashlib.sha256(preamble.encode('utf-8')).hexdigest()[:16]
+        if key in self._formats:
+            return self._formats[key]
+
+        lock = self._format_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            if key in self._formats:
+                return self._formats[key]
+
+            job_name = f"resume-{key}"
+            fmt_file = self.format_dir / f"{job_name}.fmt"
+            if not fmt_file.exists():
+                self.format_dir.mkdir(parents=True, exist_ok=True)
+                preamble_file = self.format_dir / f"{job_name}.tex"
+                preamble_file.write_text(preamble + "\\dump\n", encoding='utf-8')
+                command = [
+                    pdflatex, '-ini', '-interaction=nonstopmode', f'-jobname={job_name}',
+                    '-output-directory', str(self.format_dir), '&pdflatex', str(preamble_file),
+                ]
+                try:
+                    returncode, stdout, _ = await self._run_pdflatex(command, self.format_dir, _time_left(deadline))
+                except LatexCompileTimeout:
+                    # Out of this job's time, which says nothing about the preamble
+                    raise
+                except RuntimeError as e:
+                    returncode, stdout = -1, str(e)
+                if not fmt_file.exists():
+                    logger.warning(f"Could not build LaTeX format {job_name}, compiling without it: {stdout[-500:]}")
+                    self._formats[key] = None
+                    return None
+
+            self._formats[key] = fmt_file
+            return fmt_file
+
+    async def compile(self, latex_content: str, output_dir: Path, timeout: Optional[float] = None) -> Path:
+        """Compile LaTeX content to PDF in `output_dir` and return the PDF path"""
+        pdflatex = find_pdflatex()
+        if pdflatex is None:
+            raise RuntimeError(PDFLATEX_NOT_FOUND)
+
+        if self._waiting >= self.max_queue:
+            raise LatexCompilerBusy("Too many resumes are being generated, please retry shortly")
+
+        timeout = timeout or self.timeout_seconds
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._running += 1
+        deadline = asyncio.get_running_loop().time() + timeout
+        try:
+            tex_file = output_dir / "resume.tex"
+            pdf_file = output_dir / "resume.pdf"
+
+            preamble, separator, body = latex_content.partition(BEGIN_DOCUMENT)
+            fmt_file = await self._get_format(pdflatex, preamble, deadline) if separator else None
+            if fmt_file is not None:
+                # Only the body is typeset; the format is linked next to it so
+                # kpathsea finds it in the working directory
+                tex_file.write_text(separator + body, encoding='utf-8')
+                (output_dir / fmt_file.name).symlink_to(fmt_file)
+                command = _pdflatex_command(pdflatex, tex_file, output_dir)
+                command.insert(1, f'-fmt={fmt_file.stem}')
+                try:
+                    return await self._run_passes(command, output_dir, pdf_file, deadline)
+                except LatexCompileTimeout:
+                    raise
+                except (RuntimeError, FileNotFoundError) as e:
+                    logger.warning(f"Compiling with format {fmt_file.name} failed, retrying without it: {str(e)[:500]}")
+                    if FORMAT_ERROR_PATTERN.search(str(e)):
+                        # A stale or broken format (e.g. after a TeX Live upgrade)
+                        # is dropped so later compiles do not pay for this retry;
+                        # errors in the body (the user's content) keep it
+                        self._formats[fmt_file.stem.removeprefix("resume-")] = None
+                        fmt_file.unlink(missing_ok=True)
+
+            # Write LaTeX file
+            tex_file.write_text(latex_content, encoding='utf-8')
+            command = _pdflatex_command(pdflatex, tex_file, output_dir)
+            return await self._run_passes(command, output_dir, pdf_file, deadline)
+        except LatexCompileTimeout:
+            raise LatexCompileTimeout(f"LaTeX compilation timed out after {timeout:g} seconds") from None
+        finally:
+            self._running -= 1
+            self._semaphore.release()
+
+
+latex_compiler = LatexCompiler(
+    max_workers=settings.latex_max_workers,
+    max_queue=settings.latex_max_queued_jobs,
+    timeout_seconds=settings.latex_compile_timeout_seconds,
+    format_dir=Path(settings.latex_format_dir or Path(tempfile.gettempdir()) / "portfolio-latex-formats")
+    if settings.latex_use_precompiled_preamble else None,
+)
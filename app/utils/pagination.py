@@ -0,0 +1,50 @@
+"""
+Keyset (cursor) pagination helpers.
+A cursor encodes the (created_at, _id) of the last item of a page, so the next
+page is an indexed range query instead of a skip over everything before it.
+"""
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+from app.schemas.error import Error
+import base64
+
+def encode_cursor(created_at: datetime, document_id: ObjectId) -> str:
+    """Encode the sort key of the last item of a page into an opaque cursor."""
+    if created_at.tzinfo is None:
+        # If timezone-naive, assume it's UTC
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    # BSON dates have millisecond precision
+    millis = int(created_at.timestamp() * 1000)
+    raw = f"{millis}:{document_id}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Decode a cursor produced by encode_cursor, or raise HTTP 400."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        millis, document_id = base64.urlsafe_b64decode(padded).decode("ascii").split(":", 1)
+        created_at = datetime.fromtimestamp(int(millis) / 1000, tz=timezone.utc)
+        return created_at, ObjectId(document_id)
+    except (ValueError, InvalidId, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=400,
+            detail=Error(
+                message="Invalid pagination cursor",
+                status_code=400
+            ).model_dump()
+        )
+
+def before_cursor_filter(cursor: Optional[str], field: str = "created_at") -> Dict:
+    """Filter matching items strictly older than the cursor, newest-first order."""
+    if not cursor:
+        return {}
+    created_at, document_id = decode_cursor(cursor)
+    return {
+        "$or": [
+            {field: {"$lt": created_at}},
+            {field: created_at, "_id": {"$lt": document_id}},
+        ]
+    }
@@ -0,0 +1,96 @@
+"""
+Password hashing off the event loop.
+sha256_crypt with many rounds takes tens of milliseconds of CPU per call, so
+hashing and verification run on a bounded worker pool instead of inside the
+request coroutine.
+"""
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Tuple
+from passlib.context import CryptContext
+from app.config import settings
+import asyncio
+
+# Password hashing
+pwd_context = CryptContext(schemes=["sha256_crypt"], deprecated="auto")
+
+def _hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+def _verify_and_update(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+class PasswordHasher:
+    """
+    Runs pwd_context on a thread or process pool.
+
+    At most `max_concurrency` jobs are submitted at once; the rest wait on a
+    semaphore, and `queue_depth` reports how many are waiting.
+    """
+
+    def __init__(self, max_concurrency: int = 4, executor_type: str = "thread") -> None:
+        self.max_concurrency = max_concurrency
+        self.executor_type = executor_type
+        self._executor: Optional[Executor] = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._waiting = 0
+        self._running = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return self._waiting
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.executor_type,
+            "max_concurrency": self.max_concurrency,
+            "running": self._running,
+            "queue_depth": self._waiting,
+        }
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_concurrency)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency,
+                    thread_name_prefix="password-hasher",
+                )
+        return self._executor
+
+    async def _run(self, func, *args):
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+        self._running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._running -= 1
+            self._semaphore.release()
+
+    async def hash(self, password: str) -> str:
+        """Hash a password with the current policy."""
+        return await self._run(_hash_password, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password. Also returns a new hash when the stored one uses a
+        deprecated scheme or settings, otherwise None.
+        """
+        return await self._run(_verify_and_update, password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    max_concurrency=settings.password_hash_max_concurrency,
+    executor_type=settings.password_hash_executor,
+)
@@ -0,0 +1,114 @@
+"""
+Content-addressed cache for generated resume PDFs.
+PDFs are stored on local disk under the SHA-256 of the LaTeX source they were
+compiled from, so an unchanged profile never triggers another pdflatex run.
+"""
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def latex_cache_key(latex_content: str) -> str:
+    """Cache key (and ETag value) for a rendered LaTeX document."""
+    return hashlib.sha256(latex_content.encode("utf-8")).hexdigest()
+
+
+class PdfCache:
+    """
+    Size-bounded LRU cache of PDF files on disk.
+
+    Recency is tracked in memory (seeded from file mtimes on first use), and
+    the least recently used files are removed once the total size exceeds
+    `max_bytes`. Methods do blocking file I/O; call them via
+    `asyncio.to_thread` from request handlers.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.pdf"
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        files = sorted(self.directory.glob("*.pdf"), key=lambda p: p.stat().st_mtime)
+        for path in files:
+            size = path.stat().st_size
+            self._index[path.stem] = size
+            self._total_bytes += size
+        self._loaded = True
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._total_bytes > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+
+    def get(self, key: str) -> Optional[bytes]:
+        if self.max_bytes <= 0:
+            return None
+        with self._lock:
+            self._load()
+            try:
+                # Other worker processes may have added the file since _load
+                data = self._path(key).read_bytes()
+            except FileNotFoundError:
+                if key in self._index:
+                    self._total_bytes -= self._index.pop(key)
+                return None
+            if key not in self._index:
+                self._index[key] = len(data)
+                self._total_bytes += len(data)
+            self._index.move_to_end(key)
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if self.max_bytes <= 0 or len(data) > self.max_bytes:
+            return
+        with self._lock:
+            self._load()
+            # Write to a temp file and rename so readers never see partial PDFs
+            fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as tmp_file:
+                    tmp_file.write(data)
+                os.replace(tmp_name, self._path(key))
+            except OSError as e:
+                logger.error(f"Error writing resume PDF cache entry: {e}")
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
+                return
+            if key in self._index:
+                self._total_bytes -= self._index[key]
+            self._index[key] = len(data)
+            self._index.move_to_end(key)
+            self._total_bytes += len(data)
+            self._evict()
+
+
+pdf_cache = PdfCache(
+    directory=Path(settings.resume_pdf_cache_dir or Path(tempfile.gettempdir()) / "portfolio-resume-cache"),
+    max_bytes=settings.resume_pdf_cache_max_mb * 1024 * 1024,
+)
@@ -0,0 +1,252 @@
+"""
+Denormalized portfolio read model.
+A PortfolioSnapshot holds everything the public portfolio page shows, so the
+page is one read by _id. It is built on first read, and each section write
+refreshes only that section of an existing snapshot. Every section is stamped
+with the version it was loaded at, and a refresh only overwrites an older
+one, so concurrent or out-of-order refreshes cannot store stale data.
+The public section endpoints read through the section cache, which the same
+write hooks invalidate; reads pass the versions their ETag was built from, and
+older cached entries or snapshots are not served.
+"""
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+from beanie import PydanticObjectId
+from fastapi.encoders import jsonable_encoder
+from pymongo.errors import DuplicateKeyError
+from app.models.user import User
+from app.models.project import Project
+from app.models.skill import Skill
+from app.models.experience import Experience
+from app.models.education import Education
+from app.models.certification import Certification
+from app.models.award import Award
+from app.models.portfolio_snapshot import PortfolioSnapshot
+from app.schemas.user import UserResponse
+from app.utils.http_cache import bump_version, get_versions
+from app.utils.section_cache import section_cache
+from app.utils.visitor_counter import visitor_counter
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _newest_first(documents: List) -> List:
+    # by end_date if available, else start_date (as the projects and experiences endpoints)
+    documents.sort(key=lambda x: x.end_date if x.end_date else x.start_date, reverse=True)
+    return documents
+
+async def load_projects(user_id: PydanticObjectId) -> List[Project]:
+    return _newest_first(await Project.find(Project.user_id == user_id).to_list())
+
+async def load_skills(user_id: PydanticObjectId) -> List[Skill]:
+    return await Skill.find(Skill.user_id == user_id).to_list()
+
+async def load_experiences(user_id: PydanticObjectId) -> List[Experience]:
+    return _newest_first(await Experience.find(Experience.user_id == user_id).to_list())
+
+async def load_educations(user_id: PydanticObjectId) -> List[Education]:
+    return await Education.find(Education.user_id == user_id).to_list()
+
+async def load_certifications(user_id: PydanticObjectId) -> List[Certification]:
+    return await Certification.find(Certification.user_id == user_id).to_list()
+
+async def load_awards(user_id: PydanticObjectId) -> List[Award]:
+    return await Award.find(Award.user_id == user_id).to_list()
+
+# Snapshot field -> loader returning the section as its public endpoint does
+SECTION_LOADERS: Dict[str, Callable[[PydanticObjectId], Awaitable[List]]] = {
+    "projects": load_projects,
+    "skills": load_skills,
+    "experiences": load_experiences,
+    "educations": load_educations,
+    "certifications": load_certifications,
+    "awards": load_awards,
+}
+
+def portfolio_data(user: User) -> Dict:
+    """The portfolio fields of a user, as GET /portfolio/user/{id} returns them"""
+    return {
+        'first_name': user.first_name,
+        'middle_name': user.middle_name,
+        'last_name': user.last_name,
+        'portfolio_title': user.portfolio_title,
+        'portfolio_description': user.portfolio_description,
+        'portfolio_education': user.portfolio_education or [],
+        'portfolio_certifications': user.portfolio_certifications or [],
+        'portfolio_awards': user.portfolio_awards or [],
+        'title': user.title,
+        'phone': user.phone,
+        'github_url': user.github_url,
+        'twitter_url': user.twitter_url,
+        'instagram_url': user.instagram_url,
+        'linkedin_url': user.linkedin_url,
+        'leetcode_url': user.leetcode_url,
+        'website_url': user.website_url
+    }
+
+def _user_fields(user: User) -> Dict:
+    # visitor_count changes on every page view, so it is left out of the
+    # versioned (ETag'd, cached and snapshotted) payload and merged in fresh
+    # on read; counting a visit then changes neither the ETag nor the caches
+    return {
+        "portfolio": portfolio_data(user),
+        "user": jsonable_encoder(
+            UserResponse.model_validate(user.model_dump(exclude={"hashed_password"})),
+            exclude={"visitor_count"},
+        ),
+    }
+
+async def _cache_get(section: str, user_id: PydanticObjectId, version: int):
+    try:
+        return await section_cache.get((section, str(user_id)), version)
+    except Exception as e:
+        logger.error(f"Error reading {section} of user {user_id} from the section cache: {e}")
+        return None
+
+async def _cache_set(section: str, user_id: PydanticObjectId, version: int, value) -> None:
+    try:
+        await section_cache.set((section, str(user_id)), version, value)
+    except Exception as e:
+        logger.error(f"Error writing {section} of user {user_id} to the section cache: {e}")
+
+async def _cache_invalidate(section: str, user_id: PydanticObjectId) -> None:
+    try:
+        await section_cache.delete((section, str(user_id)))
+    except Exception as e:
+        logger.error(f"Error invalidating {section} of user {user_id} in the section cache: {e}")
+
+async def read_section(section: str, user_id: PydanticObjectId, version: int) -> List[Dict]:
+    """
+    A section as its public endpoint returns it, through the section cache.
+    `version` is the section version read before (for the ETag); loaded data
+    is cached under it, being at least that new.
+    """
+    documents = await _cache_get(section, user_id, version)
+    if documents is None:
+        documents = jsonable_encoder(await SECTION_LOADERS[section](user_id))
+        await _cache_set(section, user_id, version, documents)
+    return documents
+
+async def read_user_fields(user_id: PydanticObjectId, version: int) -> Optional[Dict]:
+    """
+    The user's `portfolio` and `user` payloads, through the section cache,
+    as `read_section`. None if there is no such user.
+    """
+    fields = await _cache_get("user", user_id, version)
+    if fields is None:
+        user = await User.get(user_id)
+        if user is None:
+            return None
+        fields = _user_fields(user)
+        await _cache_set("user", user_id, version, fields)
+    return fields
+
+def _to_response(document: Dict) -> Dict:
+    document.pop("versions", None)
+    user_id = document.pop("_id")
+    return {"user_id": str(user_id), **document}
+
+async def build_snapshot(user_id: PydanticObjectId) -> Optional[Dict]:
+    """
+    Load every section, store them as the user's snapshot and return it.
+    A write landing during the build finds no snapshot to refresh, so the
+    snapshot is dropped again if any version moved while it was being built.
+    """
+    versions = await get_versions(user_id)
+    user, *sections = await asyncio.gather(
+        User.get(user_id),
+        *(loader(user_id) for loader in SECTION_LOADERS.values()),
+    )
+    if user is None:
+        return None
+
+    document = {
+        "_id": user_id,
+        **_user_fields(user),
+        **{name: jsonable_encoder(section) for name, section in zip(SECTION_LOADERS, sections)},
+        "versions": versions,
+        "updated_at": datetime.now(timezone.utc),
+    }
+    try:
+        await PortfolioSnapshot.get_motor_collection().insert_one(document)
+    except DuplicateKeyError:
+        # Built concurrently by another read, which keeps its own copy
+        pass
+    else:
+        if await get_versions(user_id) != versions:
+            await _discard(user_id)
+    return _to_response(document)
+
+def _is_older(document: Dict, versions: Dict[str, int]) -> bool:
+    stored = document.get("versions") or {}
+    return any(stored.get(section, -1) < version for section, version in versions.items())
+
+async def get_snapshot(user_id: PydanticObjectId, versions: Optional[Dict[str, int]] = None) -> Optional[Dict]:
+    """
+    The user's snapshot, building it if it does not exist yet; None if no such user.
+    A snapshot older than `versions` (the ETag's; a refresh is in flight or
+    failed) is rebuilt rather than served. The visitor count is merged in fresh.
+    """
+    document, visitor_count = await asyncio.gather(
+        PortfolioSnapshot.get_motor_collection().find_one({"_id": user_id}),
+        visitor_counter.count(user_id),
+    )
+    if document is not None and versions and _is_older(document, versions):
+        await _discard(user_id)
+        document = None
+    snapshot = _to_response(document) if document is not None else await build_snapshot(user_id)
+    if snapshot is not None:
+        snapshot["user"] = {**snapshot["user"], "visitor_count": visitor_count or 0}
+    return snapshot
+
+async def _set_fields(user_id: PydanticObjectId, section: str, version: int, fields: Dict) -> None:
+    # Only existing snapshots are updated, and only if they hold an older
+    # version of the section; a missing one is built in full on read
+    await PortfolioSnapshot.get_motor_collection().update_one(
+        {"_id": user_id, f"versions.{section}": {"$not": {"$gte": version}}},
+        {"$set": {**fields, f"versions.{section}": version, "updated_at": datetime.now(timezone.utc)}},
+    )
+
+async def _bump_version(user_id: PydanticObjectId, section: str) -> Optional[int]:
+    try:
+        return await bump_version(user_id, section)
+    except Exception as e:
+        logger.error(f"Error bumping {section} version for user {user_id}: {e}")
+        return None
+
+async def refresh_section(user_id: PydanticObjectId, section: str) -> None:
+    """Reload one section after a write to it, invalidate its cache entry and change its ETag"""
+    await _cache_invalidate(section, user_id)
+    # Bump before loading, so the data stored under a version is at least that new
+    version = await _bump_version(user_id, section)
+    try:
+        if version is None:
+            raise RuntimeError("no version to stamp the section with")
+        documents = await SECTION_LOADERS[section](user_id)
+        await _set_fields(user_id, section, version, {section: jsonable_encoder(documents)})
+    except Exception as e:
+        # The write itself succeeded; drop the snapshot so the next read rebuilds it
+        logger.error(f"Error refreshing {section} in portfolio snapshot for user {user_id}: {e}")
+        await _discard(user_id)
+
+async def refresh_user(user_id: PydanticObjectId) -> None:
+    """Reload the portfolio and user fields after the user document changed, invalidate their cache entry and change their ETag"""
+    await _cache_invalidate("user", user_id)
+    version = await _bump_version(user_id, "user")
+    try:
+        if version is None:
+            raise RuntimeError("no version to stamp the section with")
+        user = await User.get(user_id)
+        if user is None:
+            raise RuntimeError("user not found")
+        await _set_fields(user_id, "user", version, _user_fields(user))
+    except Exception as e:
+        logger.error(f"Error refreshing portfolio snapshot for user {user_id}: {e}")
+        await _discard(user_id)
+
+async def _discard(user_id: PydanticObjectId) -> None:
+    try:
+        await PortfolioSnapshot.get_motor_collection().delete_one({"_id": user_id})
+    except Exception as e:
+        logger.error(f"Error discarding portfolio snapshot for user {user_id}: {e}")
@@ -0,0 +1,77 @@
+"""
+Shared data loader for a user's full profile.
+Fetches the user and every portfolio section concurrently, sorted server-side
+and projected down to the fields the resume renderer reads.
+"""
+from typing import Dict, List, Optional
+from beanie import Document, PydanticObjectId
+from app.models.user import User
+from app.models.experience import Experience
+from app.models.education import Education
+from app.models.project import Project
+from app.models.skill import Skill
+from app.models.certification import Certification
+from app.models.award import Award
+import asyncio
+
+# Fields read by the resume renderer, per collection
+USER_FIELDS = [
+    "first_name", "middle_name", "last_name", "portfolio_title", "email", "phone",
+    "linkedin_url", "github_url", "leetcode_url",
+]
+EXPERIENCE_FIELDS = ["title", "company", "description", "start_date", "end_date"]
+EDUCATION_FIELDS = ["institution", "description", "start_date", "end_date"]
+PROJECT_FIELDS = ["title", "description", "technologies", "start_date", "end_date"]
+SKILL_FIELDS = ["name", "category"]
+CERTIFICATION_FIELDS = ["name", "issuer", "issue_date", "description"]
+AWARD_FIELDS = ["name", "issuer", "issue_date", "description"]
+
+# Most recent first: end_date if available, else start_date
+DATE_SORT_STAGES = [
+    {"$addFields": {"_sort_date": {"$ifNull": ["$end_date", "$start_date"]}}},
+    {"$sort": {"_sort_date": -1, "_id": 1}},
+]
+
+def _projection(fields: List[str]) -> Dict:
+    return {"_id": 0, **{field: 1 for field in fields}}
+
+async def _load_section(model: type[Document], user_id: PydanticObjectId, fields: List[str], sort_by_dates: bool = False) -> List[Dict]:
+    pipeline: List[Dict] = [{"$match": {"user_id": user_id}}]
+    if sort_by_dates:
+        pipeline += DATE_SORT_STAGES
+    else:
+        # Insertion order, as the section endpoints return it
+        pipeline.append({"$sort": {"_id": 1}})
+    pipeline.append({"$project": _projection(fields)})
+    return await model.aggregate(pipeline).to_list()
+
+async def _load_user(user_id: PydanticObjectId) -> Optional[Dict]:
+    return await User.get_motor_collection().find_one({"_id": user_id}, _projection(USER_FIELDS))
+
+async def load_full_profile(user_id: PydanticObjectId) -> Optional[Dict]:
+    """
+    Load the user and all portfolio sections in one concurrent round trip.
+    Returns None if the user does not exist; otherwise a dict with `user_data`
+    and one list of plain dicts per section.
+    """
+    user_data, experiences, educations, projects, skills, certifications, awards = await asyncio.gather(
+        _load_user(user_id),
+        _load_section(Experience, user_id, EXPERIENCE_FIELDS, sort_by_dates=True),
+        _load_section(Education, user_id, EDUCATION_FIELDS, sort_by_dates=True),
+        _load_section(Project, user_id, PROJECT_FIELDS, sort_by_dates=True),
+        _load_section(Skill, user_id, SKILL_FIELDS),
+        _load_section(Certification, user_id, CERTIFICATION_FIELDS),
+        _load_section(Award, user_id, AWARD_FIELDS),
+    )
+    if user_data is None:
+        return None
+
+    return {
+        "user_data": user_data,
+        "experiences": experiences,
+        "educations": educations,
+        "projects": projects,
+        "skills": skills,
+        "certifications": certifications,
+        "awards": awards,
+    }
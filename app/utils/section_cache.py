@@ -0,0 +1,157 @@
+"""
+Read-through cache for public portfolio sections.
+Sections are cached as their JSON-ready payload under (section, user_id),
+together with the section version they were loaded at, filled on read and
+invalidated by the section write handlers. A lookup names the version the
+request's ETag was built from, and an entry of any other version is a miss,
+so a stale entry (another worker's, or one written back by a reader that
+raced a write) is never served under a newer ETag. The backend is
+pluggable: an in-process LRU with a TTL by default, or any Redis-compatible
+server.
+"""
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import json
+import time
+
+from app.config import settings
+
+# (section, user_id)
+CacheKey = Tuple[str, str]
+
+
+class SectionCache(ABC):
+    """
+    Interface implemented by the cache backends. Values are JSON-compatible
+    and stored with their version as {"version": ..., "value": ...}.
+    Counts hits and misses; backends that evict entries themselves count
+    evictions too.
+    """
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, key: CacheKey, version: int) -> Optional[Any]:
+        """The value cached under `key` if it is of `version`, else None"""
+        entry = await self._get(key)
+        if entry is None or entry["version"] != version:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["value"]
+
+    async def set(self, key: CacheKey, version: int, value: Any) -> None:
+        await self._set(key, {"version": version, "value": value})
+
+    @abstractmethod
+    async def delete(self, key: CacheKey) -> None:
+        ...
+
+    @abstractmethod
+    async def _get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def _set(self, key: CacheKey, entry: Dict[str, Any]) -> None:
+        ...
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+class InMemorySectionCache(SectionCache):
+    """
+    Bounded LRU cache with a TTL, per process. Other workers are not told
+    about invalidations; their stale entries miss on the version check.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 30) -> None:
+        super().__init__()
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[CacheKey, Tuple[Dict[str, Any], float]]" = OrderedDict()
+
+    async def _get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        cached = self._entries.get(key)
+        if cached is None:
+            return None
+        entry, cached_at = cached
+        if time.monotonic() - cached_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def _set(self, key: CacheKey, entry: Dict[str, Any]) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (entry, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, key: CacheKey) -> None:
+        self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "entries": len(self._entries), "max_size": self.max_size}
+
+
+class RedisSectionCache(SectionCache):
+    """
+    Cache shared by all workers in a Redis-compatible server, entries expiring
+    after `ttl_seconds`. Needs the optional `redis` package. Evictions are done
+    by the server and not counted here.
+    """
+
+    def __init__(self, url: str, ttl_seconds: float = 30, prefix: str = "portfolio") -> None:
+        super().__init__()
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("The redis section cache backend needs the 'redis' package installed")
+        self._client = redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def _key(self, key: CacheKey) -> str:
+        section, user_id = key
+        return f"{self.prefix}:{section}:{user_id}"
+
+    async def _get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        raw = await self._client.get(self._key(key))
+        return json.loads(raw) if raw is not None else None
+
+    async def _set(self, key: CacheKey, entry: Dict[str, Any]) -> None:
+        await self._client.set(self._key(key), json.dumps(entry), ex=int(self.ttl_seconds))
+
+    async def delete(self, key: CacheKey) -> None:
+        await self._client.delete(self._key(key))
+
+
+def create_section_cache(backend: str) -> SectionCache:
+    """Build the cache backend named by the portfolio_section_cache_backend setting"""
+    if backend == "memory":
+        return InMemorySectionCache(
+            max_size=settings.portfolio_section_cache_max_entries,
+            ttl_seconds=settings.portfolio_section_cache_ttl_seconds,
+        )
+    if backend == "redis":
+        if not settings.portfolio_section_cache_redis_url:
+            raise ValueError("PORTFOLIO_SECTION_CACHE_REDIS_URL must be set for the redis section cache backend")
+        return RedisSectionCache(settings.portfolio_section_cache_redis_url, ttl_seconds=settings.portfolio_section_cache_ttl_seconds)
+    raise ValueError(f"Unknown portfolio section cache backend: {backend}")
+
+
+section_cache = create_section_cache(settings.portfolio_section_cache_backend)
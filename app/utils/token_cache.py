@@ -0,0 +1,113 @@
+"""
+Verified-token cache.
+Keeps recently authenticated users in memory so `get_current_user` does not
+have to hit MongoDB on every request.
+"""
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Optional, Set, Tuple
+from beanie import PydanticObjectId
+import hashlib
+import threading
+import time
+
+from app.models.user import User
+from app.config import settings
+
+
+def hash_token(token: str) -> str:
+    """Return the cache key for a raw JWT (never keep raw tokens as keys)."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of verified tokens with a TTL.
+
+    Each entry holds the resolved `User`, the AccessToken id and the token
+    expiry. Entries are
+    dropped when the TTL elapses, when the token itself expires, or when
+    one of the invalidation hooks is called (logout, refresh, user update).
+    The cache is per process, so in multi-worker deployments a revoked token
+    may still be accepted by another worker for at most `ttl_seconds`.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 60) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[User, PydanticObjectId, datetime, float]]" = OrderedDict()
+        self._user_keys: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[Tuple[User, PydanticObjectId]]:
+        """Return a copy of the cached user and the AccessToken id for `token`, or None on a miss."""
+        if self.max_size <= 0:
+            return None
+        key = hash_token(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            user, token_id, expires_at, cached_at = entry
+            now = time.monotonic()
+            if now - cached_at > self.ttl_seconds or expires_at < datetime.now(timezone.utc):
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+        # Handlers mutate current_user (e.g. portfolio updates), so never hand
+        # out the shared instance.
+        return user.model_copy(), token_id
+
+    def set(self, token: str, user: User, token_id: PydanticObjectId, expires_at: datetime) -> None:
+        """Cache the resolved user for `token` until `expires_at` or the TTL."""
+        if self.max_size <= 0:
+            return
+        if expires_at.tzinfo is None:
+            # If timezone-naive, assume it's UTC
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        key = hash_token(token)
+        user_id = str(user.id)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (user.model_copy(), token_id, expires_at, time.monotonic())
+            self._user_keys.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+
+    def invalidate(self, token: str) -> None:
+        """Drop a single token (logout, refresh)."""
+        with self._lock:
+            self._remove(hash_token(token))
+
+    def invalidate_user(self, user_id) -> None:
+        """Drop every cached token for a user (profile or status changes)."""
+        with self._lock:
+            for key in list(self._user_keys.get(str(user_id), ())):
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_id = str(entry[0].id)
+        keys = self._user_keys.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                self._user_keys.pop(user_id, None)
+
+
+token_cache = TokenCache(
+    max_size=settings.token_cache_max_size,
+    ttl_seconds=settings.token_cache_ttl_seconds,
+)
@@ -1,6 +1,11 @@
 """
 Token cleanup utility.
 Removes expired tokens from the database to prevent database bloat.
+
+Expired tokens are normally removed by MongoDB itself through the TTL index on
+`AccessToken.expires_at`. The sweep below is a fallback for deployments where
+the TTL monitor lags behind (it runs roughly once a minute) or the index has
+not been created yet.
 """
 from datetime import datetime, timezone
 from app.models.access_token import AccessToken
@@ -8,40 +13,53 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-async def cleanup_expired_access_tokens() -> int:
+# Number of expired tokens removed per delete_many round trip
+CLEANUP_CHUNK_SIZE = 5000
+
+async def ensure_access_token_ttl_index(database) -> None:
+    """
+    Convert a pre-existing plain `expires_at` index into a TTL index.
+    Must run before init_beanie, which would otherwise fail on the index
+    options conflict. Does nothing if the collection or index is missing.
+    """
+    try:
+        await database.command(
+            "collMod",
+            AccessToken.Settings.name,
+            index={"keyPattern": {"expires_at": 1}, "expireAfterSeconds": 0},
+        )
+    except Exception as e:
+        logger.debug(f"TTL index conversion for access tokens skipped: {e}")
+
+async def cleanup_expired_access_tokens(chunk_size: int = CLEANUP_CHUNK_SIZE) -> int:
     """
     Remove all expired access tokens from the database.
+    Deletes server-side with delete_many in chunks of `chunk_size`.
     Returns the number of tokens deleted.
     """
     try:
         current_time = datetime.now(timezone.utc)
-        
-        # Get all tokens and check expiration manually to handle timezone issues
-        all_tokens = await AccessToken.find().to_list()
-        expired_tokens = []
-        
-        for token in all_tokens:
-            expires_at = token.expires_at
-            # Handle both timezone-aware and timezone-naive datetimes
-            if expires_at.tzinfo is None:
-                # If timezone-naive, assume it's UTC
-                expires_at = expires_at.replace(tzinfo=timezone.utc)
-            
-            if expires_at < current_time:
-                expired_tokens.append(token)
-        
-        if not expired_tokens:
-            return 0
-        
-        # Delete expired tokens
+        collection = AccessToken.get_motor_collection()
+        expired_filter = {"expires_at": {"$lt": current_time}}
+
         deleted_count = 0
-        for token in expired_tokens:
-            await token.delete()
-            deleted_count += 1
-        
+        while True:
+            # Only the ids of one chunk are pulled, never the documents
+            expired_ids = [
+                doc["_id"]
+                async for doc in collection.find(expired_filter, {"_id": 1}).limit(chunk_size)
+            ]
+            if not expired_ids:
+                break
+
+            result = await collection.delete_many({"_id": {"$in": expired_ids}})
+            deleted_count += result.deleted_count
+            if len(expired_ids) < chunk_size:
+                break
+
         if deleted_count > 0:
             logger.info(f"Cleaned up {deleted_count} expired access tokens")
-        
+
         return deleted_count
     except Exception as e:
         logger.error(f"Error cleaning up expired tokens: {e}")
@@ -63,26 +81,16 @@ async def get_token_stats() -> dict:
     """
     try:
         current_time = datetime.now(timezone.utc)
-        
-        # Get all tokens and check expiration manually to handle timezone issues
-        all_tokens = await AccessToken.find().to_list()
-        total_count = len(all_tokens)
-        expired_count = 0
-        
-        for token in all_tokens:
-            expires_at = token.expires_at
-            # Handle both timezone-aware and timezone-naive datetimes
-            if expires_at.tzinfo is None:
-                # If timezone-naive, assume it's UTC
-                expires_at = expires_at.replace(tzinfo=timezone.utc)
-            
-            if expires_at < current_time:
-                expired_count += 1
-        
+        collection = AccessToken.get_motor_collection()
+
+        # Counted server-side; the expired count is covered by the expires_at index
+        total_count = await collection.estimated_document_count()
+        expired_count = await collection.count_documents({"expires_at": {"$lt": current_time}})
+
         return {
             "total_tokens": total_count,
             "expired_tokens": expired_count,
-            "active_tokens": total_count - expired_count
+            "active_tokens": max(total_count - expired_count, 0)
         }
     except Exception as e:
         logger.error(f"Error getting token stats: {e}")
@@ -0,0 +1,62 @@
+"""
+Write-behind tracking of access token usage.
+Coalesces `last_used_at` touches in memory and flushes them to the database
+in a single bulk write instead of saving the token document on every request.
+Touches are keyed by the AccessToken id, so no raw tokens are kept in memory.
+"""
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from beanie import PydanticObjectId
+from pymongo import UpdateOne
+from app.models.access_token import AccessToken
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TokenUsageBuffer:
+    """In-memory buffer of the most recent use of each token."""
+
+    def __init__(self) -> None:
+        self._pending: Dict[PydanticObjectId, datetime] = {}
+
+    def touch(self, token_id: PydanticObjectId, used_at: Optional[datetime] = None) -> None:
+        """Record that the AccessToken `token_id` was used; only the latest timestamp is kept."""
+        used_at = used_at or datetime.now(timezone.utc)
+        previous = self._pending.get(token_id)
+        if previous is None or used_at > previous:
+            self._pending[token_id] = used_at
+
+    def discard(self, token_id: PydanticObjectId) -> None:
+        """Forget a pending touch (e.g. the token was just deleted)."""
+        self._pending.pop(token_id, None)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def flush(self) -> int:
+        """
+        Write all pending touches with one unordered bulk_write of `$max`
+        updates. Returns the number of tokens written.
+        """
+        if not self._pending:
+            return 0
+
+        # Swap the buffer first so touches arriving during the write are kept
+        pending, self._pending = self._pending, {}
+        operations = [
+            UpdateOne({"_id": token_id}, {"$max": {"last_used_at": used_at}})
+            for token_id, used_at in pending.items()
+        ]
+        try:
+            await AccessToken.get_motor_collection().bulk_write(operations, ordered=False)
+        except Exception as e:
+            logger.error(f"Error flushing token usage: {e}")
+            # Put the touches back so the next flush retries them
+            for token_id, used_at in pending.items():
+                self.touch(token_id, used_at)
+            return 0
+        return len(operations)
+
+
+token_usage = TokenUsageBuffer()
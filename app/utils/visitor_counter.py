@@ -0,0 +1,141 @@
+"""
+Portfolio visitor counting.
+Visits are counted with atomic `$inc` updates on the user's `visitor_count`
+and on a per-day DailyVisit bucket. Optionally, visits are aggregated in
+memory per user and day and flushed periodically in one bulk write per
+collection, so a traffic spike does not write the users document on every hit.
+The count is not part of the versioned (ETag'd and cached) portfolio payloads,
+so a visit touches nothing but the counters.
+"""
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from beanie import PydanticObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from app.models.user import User
+from app.models.daily_visit import DailyVisit
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def visit_day(visited_at: Optional[datetime] = None) -> datetime:
+    """Midnight UTC of the day of `visited_at` (default: now), the bucket key"""
+    visited_at = visited_at or datetime.now(timezone.utc)
+    return datetime(visited_at.year, visited_at.month, visited_at.day, tzinfo=timezone.utc)
+
+
+class VisitorCounter:
+    """
+    Counts visits, either straight to the database or, with `buffered`,
+    into an in-memory aggregate that `flush` writes out.
+    In buffered mode the returned counts include this worker's pending visits
+    but not other workers'.
+    """
+
+    def __init__(self, buffered: bool = False) -> None:
+        self.buffered = buffered
+        # user_id -> day -> visits not yet written
+        self._pending: Dict[PydanticObjectId, Dict[datetime, int]] = {}
+
+    def _add(self, user_id: PydanticObjectId, day: datetime, count: int) -> None:
+        days = self._pending.setdefault(user_id, {})
+        days[day] = days.get(day, 0) + count
+
+    def pending_for(self, user_id: PydanticObjectId) -> int:
+        return sum(self._pending.get(user_id, {}).values())
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def count(self, user_id: PydanticObjectId) -> Optional[int]:
+        """The user's visitor count, including this worker's pending visits; None if there is no such user"""
+        user = await User.get_motor_collection().find_one({"_id": user_id}, {"visitor_count": 1})
+        if user is None:
+            return None
+        return (user.get("visitor_count") or 0) + self.pending_for(user_id)
+
+    async def increment(self, user_id: PydanticObjectId) -> Optional[int]:
+        """Count one visit. Returns the user's visitor count, or None if there is no such user."""
+        if self.buffered:
+            return await self._increment_buffered(user_id)
+        return await self._increment_now(user_id)
+
+    async def _increment_now(self, user_id: PydanticObjectId) -> Optional[int]:
+        user = await User.get_motor_collection().find_one_and_update(
+            {"_id": user_id},
+            {"$inc": {"visitor_count": 1}},
+            projection={"visitor_count": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        if user is None:
+            return None
+        try:
+            await DailyVisit.get_motor_collection().update_one(
+                {"user_id": user_id, "day": visit_day()},
+                {"$inc": {"count": 1}},
+                upsert=True,
+            )
+        except Exception as e:
+            logger.error(f"Error counting daily visit for user {user_id}: {e}")
+        return user["visitor_count"]
+
+    async def _increment_buffered(self, user_id: PydanticObjectId) -> Optional[int]:
+        visitor_count = await self.count(user_id)
+        if visitor_count is None:
+            return None
+        self._add(user_id, visit_day(), 1)
+        return visitor_count + 1
+
+    async def flush(self) -> int:
+        """
+        Write all pending visits: one unordered bulk_write of `$inc` updates on
+        users and one of upserts on the day buckets. Returns the number of
+        visits written.
+        """
+        if not self._pending:
+            return 0
+
+        # Swap the buffer first so visits arriving during the write are kept
+        pending, self._pending = self._pending, {}
+        per_user = {user_id: sum(days.values()) for user_id, days in pending.items()}
+        user_ids = list(per_user)
+
+        try:
+            await User.get_motor_collection().bulk_write(
+                [UpdateOne({"_id": user_id}, {"$inc": {"visitor_count": per_user[user_id]}}) for user_id in user_ids],
+                ordered=False,
+            )
+        except Exception as e:
+            logger.error(f"Error flushing visitor counts: {e}")
+            # Put the visits back so the next flush retries them; after a
+            # partial failure only the failed ones, as $inc is not idempotent
+            if isinstance(e, BulkWriteError):
+                failed = {user_ids[error["index"]] for error in e.details.get("writeErrors", [])}
+            else:
+                failed = set(user_ids)
+            for user_id in failed:
+                for day, count in pending.pop(user_id).items():
+                    self._add(user_id, day, count)
+                del per_user[user_id]
+            if not pending:
+                return 0
+
+        try:
+            await DailyVisit.get_motor_collection().bulk_write(
+                [
+                    UpdateOne({"user_id": user_id, "day": day}, {"$inc": {"count": count}}, upsert=True)
+                    for user_id, days in pending.items()
+                    for day, count in days.items()
+                ],
+                ordered=False,
+            )
+        except Exception as e:
+            # The totals are written; losing a day's analytics beats counting visits twice
+            logger.error(f"Error flushing daily visit buckets: {e}")
+
+        return sum(per_user.values())
+
+
+visitor_counter = VisitorCounter(buffered=settings.visitor_count_buffered)
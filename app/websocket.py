@@ -1,10 +1,22 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
 from app.websocket_manager import ConnectionManager
-from app.utils.auth import verify_token
+from app.websocket_pubsub import create_pubsub
+from app.utils.auth import verify_token, get_current_user, require_role
 from app.models.user import User
+from app.config import settings
 
 router = APIRouter()
-manager = ConnectionManager()
+manager = ConnectionManager(
+    send_queue_size=settings.websocket_send_queue_size,
+    overflow_policy=settings.websocket_overflow_policy,
+    pubsub=create_pubsub(settings.websocket_pubsub_backend),
+    ping_interval=settings.websocket_ping_interval_seconds,
+    idle_timeout=settings.websocket_idle_timeout_seconds,
+    max_connections_per_user=settings.websocket_max_connections_per_user,
+    max_connections=settings.websocket_max_connections,
+    replay_buffer_size=settings.websocket_replay_buffer_size,
+    replay_max_users=settings.websocket_replay_max_users,
+)
 
 @router.websocket("/ws/messages")
 async def websocket_messages(websocket: WebSocket):
@@ -24,9 +36,25 @@ async def websocket_messages(websocket: WebSocket):
         return
 
     user_id = str(user.id)
-    await manager.connect(user_id, websocket)
+    # Sequence number of the last event the client received, to resume from
+    since = websocket.query_params.get("since")
+    if since is not None and not since.isdigit():
+        await websocket.close(code=1008)
+        return
+
+    if not await manager.connect(user_id, websocket, since=int(since) if since is not None else None):
+        return
     try:
         while True:
+            # Any message, including {"event": "pong"}, keeps the socket alive
             await websocket.receive_text()
+            manager.touch(websocket)
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect(user_id, websocket)
+
+@router.get("/ws/stats", dependencies=[Depends(require_role("admin"))])
+async def get_websocket_stats(current_user: User = Depends(get_current_user)):
+    """Get open socket and send queue gauges for this worker (admin only)."""
+    return manager.stats()
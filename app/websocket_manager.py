@@ -1,18 +1,200 @@
-from typing import Dict, Set
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
 from fastapi import WebSocket
+from app.websocket_pubsub import InProcessPubSub, PubSub, clock_sequence
+import asyncio
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Close code sent to clients that cannot keep up or exceed a connection cap
+# (RFC 6455 "Try Again Later")
+TRY_AGAIN_LATER_CLOSE_CODE = 1013
+# Close code sent to sockets that stopped answering pings ("Going Away")
+IDLE_CLOSE_CODE = 1001
+
+PING_EVENT = json.dumps({"event": "ping"}, separators=(",", ":"))
+# Sent instead of a replay when events after the client's `since` are gone
+RESYNC_EVENT = json.dumps({"event": "resync"}, separators=(",", ":"))
+
+
+def with_seq(text: str, seq: int) -> str:
+    """Add a "seq" field to a serialized JSON object without re-encoding it"""
+    rest = text[1:]
+    return '{"seq":' + str(seq) + ("," + rest if rest != "}" else "}")
+
+
+class ReplayBuffer:
+    """
+    The most recent events per user, for clients resuming with `since`.
+    Keeps up to `size` events for each of up to `max_users` users, least
+    recently active users evicted first. `floor` is the sequence number after
+    which events are known to be complete: it starts at the time the buffer
+    was created and moves up when a user's history is evicted.
+    """
+
+    def __init__(self, size: int = 100, max_users: int = 10000) -> None:
+        self.size = size
+        self.max_users = max_users
+        self.floor = clock_sequence()
+        # user_id -> (events, seq of the newest event dropped from them)
+        self._users: "OrderedDict[str, Tuple[Deque[Tuple[int, str]], int]]" = OrderedDict()
+
+    def append(self, user_id: str, seq: int, text: str) -> None:
+        if self.size <= 0:
+            return
+        entry = self._users.get(user_id)
+        if entry is None:
+            entry = (deque(maxlen=self.size), 0)
+            self._users[user_id] = entry
+        else:
+            self._users.move_to_end(user_id)
+        events = entry[0]
+        if len(events) == self.size:
+            self._users[user_id] = (events, events[0][0])
+        events.append((seq, text))
+
+        while len(self._users) > self.max_users:
+            _, (evicted, _) = self._users.popitem(last=False)
+            self.floor = max(self.floor, evicted[-1][0])
+
+    def since(self, user_id: str, seq: int) -> Optional[List[str]]:
+        """Events for the user after `seq`, oldest first, or None if some are gone"""
+        entry = self._users.get(user_id)
+        events, dropped_seq = entry if entry is not None else ((), 0)
+        if seq < max(self.floor, dropped_seq):
+            return None
+        return [text for event_seq, text in events if event_seq > seq]
+
+
+class Connection:
+    """One socket with its bounded send queue and the task that drains it."""
+
+    def __init__(self, user_id: str, websocket: WebSocket, queue_size: int) -> None:
+        self.user_id = user_id
+        self.websocket = websocket
+        # Items are (text, size in bytes)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.queued_bytes = 0
+        self.last_seen = time.monotonic()
+        self.writer_task: asyncio.Task = None  # type: ignore
 
 
 class ConnectionManager:
-    def __init__(self) -> None:
+    """
+    Tracks open sockets per user and fans events out to them.
+
+    Each event is serialized to JSON once and put on every target socket's
+    bounded queue without awaiting any send, so one slow client never delays
+    delivery to the others. A writer task per socket drains its queue. When a
+    queue overflows, the `overflow_policy` decides: "disconnect" closes the
+    socket, "drop_oldest" discards the oldest queued event.
+
+    Events are published through `pubsub` and delivered to local sockets when
+    the backend hands them back, so with a shared backend they also reach
+    sockets held by other workers.
+
+    With an `idle_timeout` (0, the default, turns this off), a ping event is
+    queued on each socket every `ping_interval` seconds and a socket that has
+    sent nothing (pongs included) for `idle_timeout` seconds is closed, which
+    reaps abandoned tabs. Only clients that answer the ping event should
+    enable it; half-open TCP connections are already detected by the server's
+    protocol-level pings (uvicorn --ws-ping-interval/--ws-ping-timeout). New
+    sockets beyond `max_connections_per_user` or `max_connections` (0 means
+    unlimited) are refused.
+
+    Events carry the backend's sequence number as "seq" and are kept in a
+    ReplayBuffer, so a client reconnecting with the last seq it saw is sent
+    only what it missed.
+    """
+
+    def __init__(
+        self,
+        send_queue_size: int = 100,
+        overflow_policy: str = "disconnect",
+        pubsub: Optional[PubSub] = None,
+        ping_interval: float = 30,
+        idle_timeout: float = 0,
+        max_connections_per_user: int = 0,
+        max_connections: int = 0,
+        replay_buffer_size: int = 100,
+        replay_max_users: int = 10000,
+    ) -> None:
+        self.send_queue_size = send_queue_size
+        self.overflow_policy = overflow_policy
+        self.pubsub = pubsub or InProcessPubSub()
+        self.ping_interval = ping_interval
+        self.idle_timeout = idle_timeout
+        self.max_connections_per_user = max_connections_per_user
+        self.max_connections = max_connections
         self.active_connections: Dict[str, Set[WebSocket]] = {}
+        self._connections: Dict[WebSocket, Connection] = {}
+        self._close_tasks: Set[asyncio.Task] = set()
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self.replay = ReplayBuffer(size=replay_buffer_size, max_users=replay_max_users)
+        self.refused_connections = 0
+        self.reaped_connections = 0
+
+    async def start(self) -> None:
+        await self.pubsub.start(self._deliver)
+        if self.ping_interval > 0 and self.idle_timeout > 0:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat())
 
-    async def connect(self, user_id: str, websocket: WebSocket) -> None:
+    async def stop(self) -> None:
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat_task = None
+        await self.pubsub.stop()
+
+    def _at_capacity(self, user_id: str) -> bool:
+        if self.max_connections and len(self._connections) >= self.max_connections:
+            return True
+        if self.max_connections_per_user and len(self.active_connections.get(user_id, ())) >= self.max_connections_per_user:
+            return True
+        return False
+
+    async def connect(self, user_id: str, websocket: WebSocket, since: Optional[int] = None) -> bool:
+        """
+        Accept and register a socket; returns False if a connection cap refused it.
+        With `since`, first queues the user's events after that sequence number,
+        or a resync event if some of them are no longer buffered.
+        """
+        if self._at_capacity(user_id):
+            self.refused_connections += 1
+            logger.warning(f"Refusing WebSocket for user {user_id}: connection limit reached")
+            await websocket.close(code=TRY_AGAIN_LATER_CLOSE_CODE)
+            return False
         await websocket.accept()
+        connection = Connection(user_id, websocket, self.send_queue_size)
+        connection.writer_task = asyncio.create_task(self._writer(connection))
+        self._connections[websocket] = connection
         if user_id not in self.active_connections:
             self.active_connections[user_id] = set()
         self.active_connections[user_id].add(websocket)
 
+        # No await since registering, so no live event can slip in before the replay
+        if since is not None:
+            missed = self.replay.since(user_id, since)
+            for text in missed if missed is not None else [RESYNC_EVENT]:
+                self._enqueue(connection, text, len(text.encode("utf-8")))
+        return True
+
+    def touch(self, websocket: WebSocket) -> None:
+        """Record that the client sent something, which keeps the socket alive"""
+        connection = self._connections.get(websocket)
+        if connection is not None:
+            connection.last_seen = time.monotonic()
+
     def disconnect(self, user_id: str, websocket: WebSocket) -> None:
+        connection = self._connections.pop(websocket, None)
+        if connection is not None and connection.writer_task is not asyncio.current_task():
+            connection.writer_task.cancel()
         connections = self.active_connections.get(user_id)
         if not connections:
             return
@@ -20,14 +202,108 @@ class ConnectionManager:
         if not connections:
             self.active_connections.pop(user_id, None)
 
-    async def send_personal_message(self, user_id: str, message: dict) -> None:
-        connections = self.active_connections.get(user_id, set())
-        for websocket in list(connections):
+    async def _writer(self, connection: Connection) -> None:
+        try:
+            while True:
+                text, size = await connection.queue.get()
+                connection.queued_bytes -= size
+                await connection.websocket.send_text(text)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.disconnect(connection.user_id, connection.websocket)
+
+    def _enqueue(self, connection: Connection, text: str, size: int) -> None:
+        try:
+            connection.queue.put_nowait((text, size))
+            connection.queued_bytes += size
+            return
+        except asyncio.QueueFull:
+            pass
+
+        if self.overflow_policy == "drop_oldest":
+            _, dropped_size = connection.queue.get_nowait()
+            connection.queue.put_nowait((text, size))
+            connection.queued_bytes += size - dropped_size
+            return
+
+        logger.warning(f"Closing slow WebSocket for user {connection.user_id}: send queue full")
+        self._close_connection(connection, TRY_AGAIN_LATER_CLOSE_CODE)
+
+    def _close_connection(self, connection: Connection, code: int) -> None:
+        self.disconnect(connection.user_id, connection.websocket)
+        close_task = asyncio.create_task(self._close(connection.websocket, code))
+        self._close_tasks.add(close_task)
+        close_task.add_done_callback(self._close_tasks.discard)
+
+    async def _close(self, websocket: WebSocket, code: int) -> None:
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
+
+    async def _heartbeat(self) -> None:
+        ping_size = len(PING_EVENT)
+        while True:
             try:
-                await websocket.send_json(message)
-            except Exception:
-                self.disconnect(user_id, websocket)
+                await asyncio.sleep(self.ping_interval)
+                now = time.monotonic()
+                for connection in list(self._connections.values()):
+                    if now - connection.last_seen > self.idle_timeout:
+                        logger.info(f"Closing idle WebSocket for user {connection.user_id}")
+                        self.reaped_connections += 1
+                        self._close_connection(connection, IDLE_CLOSE_CODE)
+                    else:
+                        self._enqueue(connection, PING_EVENT, ping_size)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in WebSocket heartbeat: {e}")
+
+    def _fan_out(self, user_id: str, text: str, size: int) -> None:
+        for websocket in list(self.active_connections.get(user_id, ())):
+            connection = self._connections.get(websocket)
+            if connection is not None:
+                self._enqueue(connection, text, size)
+
+    def stats(self) -> dict:
+        """Gauges for this worker's sockets"""
+        connections = list(self._connections.values())
+        return {
+            "open_sockets": len(connections),
+            "connected_users": len(self.active_connections),
+            "queued_events": sum(connection.queue.qsize() for connection in connections),
+            "queued_bytes": sum(connection.queued_bytes for connection in connections),
+            "refused_connections": self.refused_connections,
+            "reaped_connections": self.reaped_connections,
+            "max_connections": self.max_connections,
+            "max_connections_per_user": self.max_connections_per_user,
+        }
+
+    @staticmethod
+    def serialize(message: dict) -> str:
+        # Same encoding as WebSocket.send_json
+        return json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+    async def _deliver(self, user_ids: Optional[List[str]], text: str, seq: int) -> None:
+        """Buffer an event received from the pub/sub backend and enqueue it on local sockets"""
+        text = with_seq(text, seq)
+        size = len(text.encode("utf-8"))
+        if user_ids is None:
+            targets = list(self.active_connections.keys())
+        else:
+            # Buffered even without a local socket: the user may reconnect here
+            targets = list(set(user_ids))
+            for user_id in targets:
+                self.replay.append(user_id, seq, text)
+        for user_id in targets:
+            self._fan_out(user_id, text, size)
+
+    async def send_personal_message(self, user_id: str, message: dict) -> None:
+        await self.pubsub.publish([user_id], self.serialize(message))
+
+    async def send_to_users(self, user_ids: Iterable[str], message: dict) -> None:
+        await self.pubsub.publish(set(user_ids), self.serialize(message))
 
     async def broadcast(self, message: dict) -> None:
-        for user_id in list(self.active_connections.keys()):
-            await self.send_personal_message(user_id, message)
+        await self.pubsub.publish(None, self.serialize(message))
@@ -0,0 +1,138 @@
+"""
+Pub/sub backends that carry WebSocket events between API workers.
+
+A socket lives in exactly one worker process, but a message can be sent
+through any of them. The ConnectionManager publishes every event here and
+delivers to its local sockets whatever the backend hands back, so with a
+shared backend an event reaches its recipients on every worker.
+
+Backends also number events: sequence numbers increase in publish order and
+are the same in every worker, so a client can resume from the last one it saw
+on whichever worker it reconnects to. They are microsecond-scale integers
+that stay below 2**53, so JavaScript clients can hold them exactly.
+"""
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Iterable, List, Optional
+from pymongo.errors import PyMongoError
+from app.models.websocket_event import WebSocketEvent
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Called with (user_ids, text, seq) for every event; user_ids None means all users
+EventHandler = Callable[[Optional[List[str]], str, int], Awaitable[None]]
+
+
+def clock_sequence() -> int:
+    """The current time on the sequence number scale"""
+    return int(time.time() * 1_000_000)
+
+
+class PubSub(ABC):
+    """Interface implemented by the pub/sub backends"""
+
+    @abstractmethod
+    async def start(self, handler: EventHandler) -> None:
+        ...
+
+    @abstractmethod
+    async def publish(self, user_ids: Optional[Iterable[str]], text: str) -> None:
+        ...
+
+    async def stop(self) -> None:
+        pass
+
+
+class InProcessPubSub(PubSub):
+    """Delivers events straight back to this process; for a single worker"""
+
+    def __init__(self) -> None:
+        self._handler: Optional[EventHandler] = None
+        self._last_seq = 0
+
+    async def start(self, handler: EventHandler) -> None:
+        self._handler = handler
+
+    async def publish(self, user_ids: Optional[Iterable[str]], text: str) -> None:
+        # Clock based so numbering keeps increasing across restarts
+        self._last_seq = max(self._last_seq + 1, clock_sequence())
+        if self._handler is not None:
+            await self._handler(list(user_ids) if user_ids is not None else None, text, self._last_seq)
+
+
+class MongoChangeStreamPubSub(PubSub):
+    """
+    Publishes events by inserting them into the `websocket_events` collection
+    and receives them, in every worker, from a change stream on it.
+    Change streams need MongoDB to run as a replica set (a single-node one is
+    enough). The stream is resumed from the last seen event after an error.
+    Sequence numbers come from the oplog cluster time of each insert.
+    """
+
+    def __init__(self, retry_delay_seconds: float = 1.0, max_retry_delay_seconds: float = 30.0) -> None:
+        self.retry_delay_seconds = retry_delay_seconds
+        self.max_retry_delay_seconds = max_retry_delay_seconds
+        self._handler: Optional[EventHandler] = None
+        self._watch_task: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
+
+    async def start(self, handler: EventHandler) -> None:
+        self._handler = handler
+        self._watch_task = asyncio.create_task(self._watch())
+        # Do not accept publishes before the stream is open, or this worker
+        # would miss its own first events
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            logger.error("WebSocket event change stream did not open; events from other workers are delayed")
+
+    async def publish(self, user_ids: Optional[Iterable[str]], text: str) -> None:
+        event = {"user_ids": list(user_ids) if user_ids is not None else None, "text": text}
+        await WebSocketEvent(**event).insert()
+
+    async def _watch(self) -> None:
+        collection = WebSocketEvent.get_motor_collection()
+        pipeline = [{"$match": {"operationType": "insert"}}]
+        resume_token = None
+        delay = self.retry_delay_seconds
+        while True:
+            try:
+                async with collection.watch(pipeline, resume_after=resume_token) as stream:
+                    self._ready.set()
+                    delay = self.retry_delay_seconds
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        event = change["fullDocument"]
+                        cluster_time = change["clusterTime"]
+                        seq = cluster_time.time * 1_000_000 + cluster_time.inc
+                        try:
+                            await self._handler(event.get("user_ids"), event["text"], seq)  # type: ignore
+                        except Exception as e:
+                            logger.error(f"Error delivering WebSocket event: {e}")
+            except asyncio.CancelledError:
+                raise
+            except PyMongoError as e:
+                logger.error(f"WebSocket event change stream failed, retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_retry_delay_seconds)
+
+    async def stop(self) -> None:
+        if self._watch_task is None:
+            return
+        self._watch_task.cancel()
+        try:
+            await self._watch_task
+        except asyncio.CancelledError:
+            pass
+        self._watch_task = None
+
+
+def create_pubsub(backend: str) -> PubSub:
+    """Build the pub/sub backend named by the websocket_pubsub_backend setting"""
+    if backend == "memory":
+        return InProcessPubSub()
+    if backend == "mongodb":
+        return MongoChangeStreamPubSub()
+    raise ValueError(f"Unknown WebSocket pub/sub backend: {backend}")